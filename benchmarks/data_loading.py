@@ -0,0 +1,313 @@
+"""Benchmarks of the data loading hot paths.
+
+Measures `MappedCollection` construction and sampling, `AnnDataAccessor` slicing
+and, with ``--registry``, `Artifact.cache` and `Collection.mapped` on synthetic
+`.h5ad` and `.zarr` files from :func:`lamindb.core.datasets.anndata_file_synthetic`.
+
+Every case runs in a fresh process and reports, where it applies,
+``samples_per_s``, ``bytes_read`` (bytes read by the process including page cache hits),
+``peak_rss_mb`` (including data loader workers) and ``startup_s``
+(the time to construct the object before the first sample).
+
+Requires a connected instance, for example a local one from
+``lamin init --storage ./benchmark-storage``. Run from the repository root::
+
+    python benchmarks/data_loading.py --out benchmark.json
+
+``--registry`` saves the synthetic files as artifacts of the connected instance
+and deletes them afterwards. Use an instance with cloud storage to measure
+`Artifact.cache` downloads.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import psutil
+
+JOINS = {"aligned": None, "inner": "inner", "outer": "outer"}
+
+
+def _bytes_read() -> int | None:
+    try:
+        io = psutil.Process().io_counters()
+    except (AttributeError, psutil.AccessDenied):
+        return None
+    return getattr(io, "read_chars", io.read_bytes)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on linux and in bytes on macos
+    unit = 1024**2 if sys.platform == "darwin" else 1024
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return peak / unit
+
+
+class _Measure:
+    """Measure the time and the bytes read in a block."""
+
+    def __enter__(self):
+        self.bytes_start = _bytes_read()
+        self.time_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.seconds = time.perf_counter() - self.time_start
+        bytes_end = _bytes_read()
+        if self.bytes_start is None or bytes_end is None:
+            self.bytes = None
+        else:
+            self.bytes = bytes_end - self.bytes_start
+
+
+def _metrics(startup: _Measure | None, run: _Measure, n_samples: int | None) -> dict:
+    metrics: dict = {"seconds": run.seconds, "peak_rss_mb": _peak_rss_mb()}
+    if startup is not None:
+        metrics["startup_s"] = startup.seconds
+    if n_samples is not None:
+        metrics["samples_per_s"] = n_samples / run.seconds
+    bytes_read = [m.bytes for m in (startup, run) if m is not None]
+    metrics["bytes_read"] = None if None in bytes_read else sum(bytes_read)
+    return metrics
+
+
+def make_files(args: argparse.Namespace) -> dict[str, list[str]]:
+    """Write the synthetic files for all formats, densities and var layouts."""
+    from lamindb.core.datasets import anndata_file_synthetic
+
+    data_dir = Path(args.data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    files = {}
+    for format in args.formats:
+        for sparse in (True, False):
+            for layout in ("aligned", "shifted"):
+                paths = []
+                for i in range(args.n_files):
+                    var_offset = i * args.n_vars // 4 if layout == "shifted" else 0
+                    kind = "sparse" if sparse else "dense"
+                    filepath = data_dir / f"{kind}_{layout}_{i}.{format}"
+                    if not filepath.exists():
+                        anndata_file_synthetic(
+                            n_obs=args.n_obs,
+                            n_vars=args.n_vars,
+                            sparse=sparse,
+                            density=args.density,
+                            format=format,
+                            var_offset=var_offset,
+                            seed=i,
+                            filepath=filepath,
+                        )
+                    paths.append(filepath.as_posix())
+                files[f"{format}/{'sparse' if sparse else 'dense'}/{layout}"] = paths
+    return files
+
+
+def bench_mapped_getitem(paths: list[str], join: str | None, n_samples: int) -> dict:
+    """Single observations by random index with `__getitem__`."""
+    from lamindb.core import MappedCollection
+
+    with _Measure() as startup:
+        mapped = MappedCollection(paths, obs_keys="cell_type", join=join)
+    idxs = np.random.default_rng(0).integers(0, len(mapped), n_samples)
+    with _Measure() as run:
+        for idx in idxs:
+            mapped[idx]
+    mapped.close()
+    return _metrics(startup, run, n_samples)
+
+
+def bench_mapped_loader(
+    paths: list[str], join: str | None, n_samples: int, batch_size: int, workers: int
+) -> dict:
+    """Random batches with `__getitems__`, through a torch data loader if workers > 0."""
+    from lamindb.core import MappedCollection
+
+    with _Measure() as startup:
+        mapped = MappedCollection(
+            paths, obs_keys="cell_type", join=join, parallel=workers > 0
+        )
+    n_batches = max(n_samples // batch_size, 1)
+    if workers == 0:
+        rng = np.random.default_rng(0)
+        with _Measure() as run:
+            for _ in range(n_batches):
+                mapped.__getitems__(rng.integers(0, len(mapped), batch_size).tolist())
+    else:
+        from torch.utils.data import DataLoader, RandomSampler
+
+        sampler = RandomSampler(
+            mapped, replacement=True, num_samples=n_batches * batch_size
+        )
+        loader = DataLoader(
+            mapped,
+            batch_size=batch_size,
+            sampler=sampler,
+            num_workers=workers,
+            worker_init_fn=mapped.torch_worker_init_fn,
+        )
+        with _Measure() as run:
+            for _ in loader:
+                pass
+    mapped.close()
+    return _metrics(startup, run, n_batches * batch_size)
+
+
+def bench_accessor(path: str, n_samples: int, batch_size: int) -> dict:
+    """Contiguous and fancy index slices of an `AnnDataAccessor` loaded to memory."""
+    from lamindb.core.storage import UPath
+    from lamindb.core.storage._backed_access import backed_access
+
+    with _Measure() as startup:
+        access = backed_access(UPath(path))
+    n_obs = access.shape[0]
+    rng = np.random.default_rng(0)
+    n_batches = max(n_samples // batch_size, 1)
+    with _Measure() as run:
+        for i in range(n_batches):
+            if i % 2 == 0:
+                start = int(rng.integers(0, max(n_obs - batch_size, 1)))
+                access[start : start + batch_size].to_memory()
+            else:
+                idxs = np.sort(rng.choice(n_obs, min(batch_size, n_obs), replace=False))
+                access[idxs].to_memory()
+    access.close()
+    return _metrics(startup, run, n_batches * batch_size)
+
+
+def bench_registry(paths: list[str], join: str | None) -> dict:
+    """`Artifact.cache` and `Collection.mapped` for artifacts of the synthetic files."""
+    import lamindb as ln
+
+    ln.settings.verbosity = "error"
+    artifacts = [
+        ln.Artifact(path, description=f"benchmark {i}").save()
+        for i, path in enumerate(paths)
+    ]
+    collection = ln.Collection(artifacts, name="benchmark").save()
+    try:
+        with _Measure() as cache:
+            for artifact in artifacts:
+                artifact.cache()
+        with _Measure() as run:
+            mapped = collection.mapped(obs_keys="cell_type", join=join)
+        mapped.close()
+        metrics = _metrics(None, run, None)
+        metrics["startup_s"] = run.seconds
+        metrics["cache_s"] = cache.seconds
+        return metrics
+    finally:
+        collection.delete(permanent=True)
+        for artifact in artifacts:
+            artifact.delete(permanent=True)
+
+
+def _run_case(func_name: str, kwargs: dict) -> dict:
+    return globals()[func_name](**kwargs)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--out", default="benchmark.json", help="The JSON output.")
+    parser.add_argument("--data-dir", default="benchmark_data")
+    parser.add_argument("--n-obs", type=int, default=20_000)
+    parser.add_argument("--n-vars", type=int, default=2_000)
+    parser.add_argument("--n-files", type=int, default=3)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--formats", nargs="+", default=["h5ad", "zarr"])
+    parser.add_argument("--joins", nargs="+", default=list(JOINS), choices=JOINS)
+    parser.add_argument("--workers", nargs="+", type=int, default=[0, 2])
+    parser.add_argument("--n-samples", type=int, default=5_000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--registry", action="store_true")
+    args = parser.parse_args(argv)
+
+    try:
+        import torch
+    except ImportError:
+        if any(workers > 0 for workers in args.workers):
+            print("torch is not installed, running only with 0 workers")
+        args.workers = [0]
+
+    files = make_files(args)
+    cases = []
+    for key, paths in files.items():
+        format, kind, layout = key.split("/")
+        for join_name in args.joins:
+            if (join_name == "aligned") != (layout == "aligned"):
+                continue
+            params = {"format": format, "kind": kind, "join": join_name}
+            join = JOINS[join_name]
+            cases.append(
+                (
+                    "mapped_getitem",
+                    params,
+                    {"paths": paths, "join": join, "n_samples": args.n_samples},
+                )
+            )
+            for workers in args.workers:
+                loader_kwargs = {
+                    "paths": paths,
+                    "join": join,
+                    "n_samples": args.n_samples,
+                    "batch_size": args.batch_size,
+                    "workers": workers,
+                }
+                cases.append(
+                    ("mapped_loader", {**params, "workers": workers}, loader_kwargs)
+                )
+            if args.registry:
+                cases.append(("registry", params, {"paths": paths, "join": join}))
+        if layout == "aligned":
+            accessor_kwargs = {
+                "path": paths[0],
+                "n_samples": args.n_samples,
+                "batch_size": args.batch_size,
+            }
+            cases.append(
+                ("accessor", {"format": format, "kind": kind}, accessor_kwargs)
+            )
+
+    results = []
+    # a fresh process for each case to measure startup and peak memory in isolation
+    context = get_context("spawn")
+    for name, params, kwargs in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            future = executor.submit(_run_case, f"bench_{name}", kwargs)
+            try:
+                result = {"metrics": future.result()}
+            except Exception as e:
+                # keep the other cases, a failure is also a result to track
+                result = {"error": f"{type(e).__name__}: {e}"}
+        print(name, params, result)
+        results.append({"name": name, "params": params, **result})
+
+    import lamindb
+
+    report = {
+        "lamindb_version": lamindb.__version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": psutil.cpu_count(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "args": {key: value for key, value in vars(args).items() if key != "out"},
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2))
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
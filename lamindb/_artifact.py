@@ -3,6 +3,7 @@ from __future__ import annotations
 import os
 import shutil
 from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path, PurePath, PurePosixPath
 from typing import TYPE_CHECKING, Any
 
@@ -16,7 +17,6 @@ from lamindb_setup import settings as setup_settings
 from lamindb_setup._init_instance import register_storage_in_instance
 from lamindb_setup.core._docs import doc_args
 from lamindb_setup.core._settings_storage import init_storage
-from lamindb_setup.core.hashing import hash_dir, hash_file
 from lamindb_setup.core.upath import (
     create_path,
     extract_suffix_from_path,
@@ -48,6 +48,7 @@ from .core.storage import (
     infer_suffix,
     write_to_disk,
 )
+from .core.storage._hash_cache import cached_hash_dir, cached_hash_file
 from .core.storage._pyarrow_dataset import PYARROW_SUFFIXES
 from .core.storage.objects import _mudata_is_installed
 from .core.storage.paths import (
@@ -72,6 +73,8 @@ except ImportError:
 
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from lamindb_setup.core.types import UPathStr
     from mudata import MuData
     from pyarrow.dataset import Dataset as PyArrowDataset
@@ -86,6 +89,7 @@ def process_pathlike(
     default_storage: Storage,
     using_key: str | None,
     skip_existence_check: bool = False,
+    storages: list[Storage] | None = None,
 ) -> tuple[Storage, bool]:
     if not skip_existence_check:
         try:  # check if file exists
@@ -102,7 +106,7 @@ def process_pathlike(
         result = False
         # within the hub, we don't want to perform check_path_in_existing_storage
         if using_key is None:
-            result = check_path_in_existing_storage(filepath, using_key)
+            result = check_path_in_existing_storage(filepath, using_key, storages)
         if isinstance(result, Storage):
             use_existing_storage_key = True
             return result, use_existing_storage_key
@@ -146,6 +150,7 @@ def process_data(
     default_storage: Storage,
     using_key: str | None,
     skip_existence_check: bool = False,
+    storages: list[Storage] | None = None,
 ) -> tuple[Any, Path | UPath, str, Storage, bool]:
     """Serialize a data object that's provided as file or in memory."""
     # if not overwritten, data gets stored in default storage
@@ -168,6 +173,7 @@ def process_data(
             default_storage=default_storage,
             using_key=using_key,
             skip_existence_check=skip_existence_check,
+            storages=storages,
         )
         suffix = extract_suffix_from_path(path)
         memory_rep = None
@@ -202,16 +208,13 @@ def process_data(
     return memory_rep, path, suffix, storage, use_existing_storage_key
 
 
-def get_stat_or_artifact(
-    path: UPath,
-    key: str | None = None,
-    check_hash: bool = True,
-    is_replace: bool = False,
-    instance: str | None = None,
-) -> tuple[int, str | None, str | None, int | None, Artifact | None] | Artifact:
+# the number of hashes or keys in a single query, below the SQLite variable limit
+QUERY_CHUNK_SIZE = 500
+
+
+def get_stat(path: UPath) -> tuple[int | None, str | None, str | None, int | None]:
+    """Get size, hash, hash type and number of objects of a file or directory."""
     n_objects = None
-    if settings.creation.artifact_skip_size_hash:
-        return None, None, None, n_objects, None
     stat = path.stat()  # one network request
     if not isinstance(path, LocalPathClasses):
         size, hash, hash_type = None, None, None
@@ -222,30 +225,98 @@ def get_stat_or_artifact(
                 size, hash, hash_type = get_stat_file_cloud(stat)
             elif store_type == "directory":
                 size, hash, hash_type, n_objects = get_stat_dir_cloud(path)
-        if hash is None:
-            logger.warning(f"did not add hash for {path}")
-            return size, hash, hash_type, n_objects, None
     else:
         if path.is_dir():
-            size, hash, hash_type, n_objects = hash_dir(path)
+            size, hash, hash_type, n_objects = cached_hash_dir(path)
         else:
-            hash, hash_type = hash_file(path)
+            hash, hash_type = cached_hash_file(path, stat)
             size = stat.st_size
+    return size, hash, hash_type, n_objects
+
+
+def get_stats(paths: list[UPath]) -> list[tuple]:
+    """Run :func:`get_stat` for many paths in a pool, in the order of `paths`."""
+    if settings.creation.artifact_skip_size_hash:
+        return [(None, None, None, None)] * len(paths)
+    max_workers = settings.creation.artifact_max_workers
+    if max_workers == 1 or len(paths) < 2:
+        return [get_stat(path) for path in paths]
+    if settings.creation.artifact_use_processes:
+        executor_class = ProcessPoolExecutor
+    else:
+        executor_class = ThreadPoolExecutor  # type: ignore
+    with executor_class(max_workers=max_workers) as executor:
+        # chunks amortize the inter-process communication for many small files
+        return list(executor.map(get_stat, paths, chunksize=64))
+
+
+def get_existing_artifacts(
+    hashes: list[str | None], keys: list[str | None], instance: str | None = None
+) -> tuple[dict[str, list[Artifact]], dict[str, list[Artifact]]]:
+    """Query the artifacts with any of the hashes or keys in chunks.
+
+    Returns the artifacts by hash and by key in the default storage, latest first.
+    """
+    storage_id = settings.storage.id
+    artifacts_by_hash: dict[str, list[Artifact]] = {}
+    artifacts_by_key: dict[str, list[Artifact]] = {}
+    for field, values, artifacts_by in (
+        ("hash", hashes, artifacts_by_hash),
+        ("key", keys, artifacts_by_key),
+    ):
+        values = list(dict.fromkeys(value for value in values if value is not None))
+        for i in range(0, len(values), QUERY_CHUNK_SIZE):
+            queryset = Artifact.objects.using(instance).filter(
+                **{f"{field}__in": values[i : i + QUERY_CHUNK_SIZE]}
+            )
+            if field == "key":
+                queryset = queryset.filter(storage_id=storage_id)
+            for artifact in queryset.order_by("-created_at").all():
+                artifacts_by.setdefault(getattr(artifact, field), []).append(artifact)
+    return artifacts_by_hash, artifacts_by_key
+
+
+def get_stat_or_artifact(
+    path: UPath,
+    key: str | None = None,
+    check_hash: bool = True,
+    is_replace: bool = False,
+    instance: str | None = None,
+    stat: tuple[int | None, str | None, str | None, int | None] | None = None,
+    existing_artifacts: list[Artifact] | None = None,
+) -> tuple[int, str | None, str | None, int | None, Artifact | None] | Artifact:
+    n_objects = None
+    if settings.creation.artifact_skip_size_hash:
+        return None, None, None, n_objects, None
+    if stat is None:
+        stat = get_stat(path)
+    size, hash, hash_type, n_objects = stat
+    if hash is None:
+        logger.warning(f"did not add hash for {path}")
+        return size, hash, hash_type, n_objects, None
     if not check_hash:
         return size, hash, hash_type, n_objects, None
     previous_artifact_version = None
     if key is None or is_replace:
-        result = Artifact.objects.using(instance).filter(hash=hash).all()
+        if existing_artifacts is None:
+            existing_artifacts = list(
+                Artifact.objects.using(instance).filter(hash=hash).all()
+            )
+        result = existing_artifacts
         artifact_with_same_hash_exists = len(result) > 0
     else:
-        storage_id = settings.storage.id
-        result = (
-            Artifact.objects.using(instance)
-            .filter(Q(hash=hash) | Q(key=key, storage_id=storage_id))
-            .order_by("-created_at")
-            .all()
+        if existing_artifacts is None:
+            storage_id = settings.storage.id
+            existing_artifacts = list(
+                Artifact.objects.using(instance)
+                .filter(Q(hash=hash) | Q(key=key, storage_id=storage_id))
+                .order_by("-created_at")
+                .all()
+            )
+        result = existing_artifacts
+        artifact_with_same_hash_exists = any(
+            artifact.hash == hash for artifact in result
         )
-        artifact_with_same_hash_exists = result.filter(hash=hash).count() > 0
         if not artifact_with_same_hash_exists and len(result) > 0:
             logger.important(
                 f"creating new artifact version for key='{key}' (storage: '{settings.storage.root_as_str}')"
@@ -278,9 +349,13 @@ def get_stat_or_artifact(
 
 
 def check_path_in_existing_storage(
-    path: Path | UPath, using_key: str | None = None
+    path: Path | UPath,
+    using_key: str | None = None,
+    storages: list[Storage] | None = None,
 ) -> Storage | bool:
-    for storage in Storage.objects.using(using_key).filter().all():
+    if storages is None:
+        storages = Storage.objects.using(using_key).filter().all()
+    for storage in storages:
         # if path is part of storage, return it
         if check_path_is_child_of_root(path, root=storage.root):
             return storage
@@ -318,6 +393,9 @@ def get_artifact_kwargs_from_data(
     using_key: str | None = None,
     is_replace: bool = False,
     skip_check_exists: bool = False,
+    precomputed_stat: tuple | None = None,
+    existing_artifacts: list[Artifact] | None = None,
+    storages: list[Storage] | None = None,
 ):
     run = get_run(run)
     memory_rep, path, suffix, storage, use_existing_storage_key = process_data(
@@ -328,12 +406,15 @@ def get_artifact_kwargs_from_data(
         default_storage,
         using_key,
         skip_check_exists,
+        storages,
     )
     stat_or_artifact = get_stat_or_artifact(
         path=path,
         key=key,
         instance=using_key,
         is_replace=is_replace,
+        stat=precomputed_stat,
+        existing_artifacts=existing_artifacts,
     )
     if isinstance(stat_or_artifact, Artifact):
         artifact = stat_or_artifact
@@ -544,6 +625,10 @@ def __init__(artifact: Artifact, *args, **kwargs):
     skip_check_exists = (
         kwargs.pop("skip_check_exists") if "skip_check_exists" in kwargs else False
     )
+    # stat, existing artifacts and storages queried ahead, see _from_paths()
+    precomputed_stat = kwargs.pop("_precomputed_stat", None)
+    existing_artifacts = kwargs.pop("_existing_artifacts", None)
+    storages = kwargs.pop("_storages", None)
     if "default_storage" in kwargs:
         default_storage = kwargs.pop("default_storage")
     else:
@@ -607,6 +692,9 @@ def __init__(artifact: Artifact, *args, **kwargs):
         default_storage=default_storage,
         using_key=using_key,
         skip_check_exists=skip_check_exists,
+        precomputed_stat=precomputed_stat,
+        existing_artifacts=existing_artifacts,
+        storages=storages,
     )
 
     # an object with the same hash already exists
@@ -748,6 +836,69 @@ def from_mudata(
     return artifact
 
 
+def _from_paths(
+    paths: Iterable[UPathStr],
+    keys: Iterable[str | None] | None = None,
+    *,
+    run: Run | None = None,
+) -> list[Artifact]:
+    """Create or look up artifacts for many files at once.
+
+    Like calling :class:`~lamindb.Artifact` for every path, but files are hashed
+    in a pool and existing artifacts and previous versions are queried for all
+    paths together in a few queries.
+
+    Args:
+        paths: Paths of files or folders.
+        keys: A key for each path.
+        run: The run that creates the artifacts.
+
+    Returns:
+        A list of artifacts in the order of `paths`, duplicate files aren't dropped.
+
+    """
+    paths = [create_path(path) for path in paths]
+    keys = [None] * len(paths) if keys is None else list(keys)
+    if len(keys) != len(paths):
+        raise ValueError(
+            f"Pass one key for each path, got {len(keys)} keys for {len(paths)} paths"
+        )
+    using_key = settings._using_key
+    # raises FileNotFoundError for missing files
+    stats = get_stats(paths)
+    if settings.creation.artifact_skip_size_hash:
+        artifacts_by_hash: dict[str, list[Artifact]] = {}
+        artifacts_by_key: dict[str, list[Artifact]] = {}
+    else:
+        artifacts_by_hash, artifacts_by_key = get_existing_artifacts(
+            [stat[1] for stat in stats], keys, using_key
+        )
+    storages = list(Storage.objects.using(using_key).filter().all())
+    artifacts = []
+    for path, key, stat in zip(paths, keys, stats):
+        existing_artifacts = artifacts_by_hash.get(stat[1], [])
+        if key is not None:
+            # same as the per-file query on hash or key, latest first
+            candidates = {
+                artifact.id: artifact
+                for artifact in existing_artifacts + artifacts_by_key.get(key, [])
+            }
+            existing_artifacts = sorted(
+                candidates.values(), key=lambda a: a.created_at, reverse=True
+            )
+        artifact = Artifact(
+            path,
+            key=key,
+            run=run,
+            skip_check_exists=True,
+            _precomputed_stat=stat,
+            _existing_artifacts=existing_artifacts,
+            _storages=storages,
+        )
+        artifacts.append(artifact)
+    return artifacts
+
+
 @classmethod  # type: ignore
 @doc_args(Artifact.from_dir.__doc__)
 def from_dir(
@@ -786,16 +937,16 @@ def from_dir(
     verbosity_int = settings._verbosity_int
     if verbosity_int >= 1:
         settings.verbosity = "warning"
+    filepaths = [filepath for filepath in folderpath.rglob("*") if filepath.is_file()]
+    artifact_keys = [
+        folder_key
+        + "/"
+        + get_relative_path_to_directory(filepath, folderpath).as_posix()
+        for filepath in filepaths
+    ]
     artifacts_dict = {}
-    for filepath in folderpath.rglob("*"):
-        if filepath.is_file():
-            relative_path = get_relative_path_to_directory(filepath, folderpath)
-            artifact_key = folder_key + "/" + relative_path.as_posix()
-            # if creating from rglob, we don't need to check for existence
-            artifact = Artifact(
-                filepath, run=run, key=artifact_key, skip_check_exists=True
-            )
-            artifacts_dict[artifact.uid] = artifact
+    for artifact in _from_paths(filepaths, artifact_keys, run=run):
+        artifacts_dict[artifact.uid] = artifact
     settings.verbosity = verbosity
 
     # run sanity check on hashes
@@ -926,9 +1077,34 @@ def open(
     if self.suffix != ".tiledbsoma" and self.key != "soma" and mode != "r":
         raise ValueError("Only a tiledbsoma store can be openened with `mode!='r'`.")
 
-    from lamindb.core.storage._backed_access import _track_writes_factory, backed_access
+    from lamindb.core.storage._backed_access import (
+        _track_writes_factory,
+        backed_access,
+        handle_pool,
+    )
 
     using_key = settings._using_key
+    if (
+        settings.pool_handles
+        and mode == "r"
+        and self.suffix in {".h5", ".hdf5", ".h5ad", ".zarr"}
+    ):
+        # reuse the open handle of this version of the artifact if there is one
+        def open_backed(metadata: tuple | None):
+            filepath, cache_key = filepath_cache_key_from_artifact(
+                self, using_key=using_key
+            )
+            localpath = setup_settings.paths.cloud_to_local_no_update(
+                filepath, cache_key=cache_key
+            )
+            if localpath.exists():
+                filepath = localpath
+            return backed_access(filepath, mode, using_key, _metadata=metadata)
+
+        access = handle_pool.open((self.uid, self.hash, mode), open_backed)
+        _track_run_input(self, is_run_input)
+        return access
+
     filepath, cache_key = filepath_cache_key_from_artifact(self, using_key=using_key)
     is_tiledbsoma_w = (
         filepath.name == "soma" or filepath.suffix == ".tiledbsoma"
@@ -948,8 +1124,8 @@ def open(
                 if not isinstance(filepath, LocalPathClasses):
                     _, hash, _, _ = get_stat_dir_cloud(filepath)
                 else:
-                    # this can be very slow
-                    _, hash, _, _ = hash_dir(filepath)
+                    # only files changed by the writes are hashed again
+                    _, hash, _, _ = cached_hash_dir(filepath)
                 if self.hash != hash:
                     from ._record import init_self_from_db
 
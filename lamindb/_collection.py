@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import json
+import shutil
 from collections import defaultdict
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -32,8 +36,9 @@ from .core._data import (
     save_feature_sets,
     view_lineage,
 )
-from .core._mapped_collection import MappedCollection
+from .core._mapped_collection import MappedCollection, _parse_obs_filter
 from .core._settings import settings
+from .core._soma_mapped_collection import SOMAMappedCollection
 from .core.versioning import process_revises
 
 if TYPE_CHECKING:
@@ -234,20 +239,126 @@ def mapped(
     stream: bool = False,
     is_run_input: bool | None = None,
 ) -> MappedCollection:
-    path_list = []
+    return _mapped(
+        self,
+        layers_keys=layers_keys,
+        obs_keys=obs_keys,
+        obsm_keys=obsm_keys,
+        obs_filter=obs_filter,
+        join=join,
+        encode_labels=encode_labels,
+        unknown_label=unknown_label,
+        cache_categories=cache_categories,
+        parallel=parallel,
+        dtype=dtype,
+        stream=stream,
+        is_run_input=is_run_input,
+    )
+
+
+def _mapped(
+    self: Collection,
+    layers_keys: str | list[str] | None = None,
+    obs_keys: str | list[str] | None = None,
+    obsm_keys: str | list[str] | None = None,
+    obs_filter: tuple[str, str | tuple[str, ...]] | dict | None = None,
+    join: Literal["inner", "outer"] | None = "inner",
+    encode_labels: bool | list[str] = True,
+    unknown_label: str | dict[str, str] | None = None,
+    cache_categories: bool = True,
+    parallel: bool = False,
+    dtype: str | None = None,
+    stream: bool = False,
+    cache_meta: bool = False,
+    save_meta: bool = False,
+    max_workers: int | None = None,
+    output: Literal["dense", "csr"] = "dense",
+    shard: tuple[int, int] | None = None,
+    preload: bool = False,
+    var_subset: pd.Index | list[str] | None = None,
+    is_run_input: bool | None = None,
+) -> MappedCollection:
+    """Implements `Collection.mapped` and `MappedCollection.from_collection`."""
     if self._state.adding:
-        artifacts = self._artifacts
+        all_artifacts = self._artifacts
         logger.warning("The collection isn't saved, consider calling `.save()`")
     else:
-        artifacts = self.ordered_artifacts.all()
-    for artifact in artifacts:
-        if artifact.suffix not in {".h5ad", ".zarr"}:
+        all_artifacts = self.ordered_artifacts.all()
+    artifacts = []
+    for artifact in all_artifacts:
+        if artifact.suffix not in {".h5ad", ".zarr", ".tiledbsoma"}:
             logger.warning(f"Ignoring artifact with suffix {artifact.suffix}")
             continue
-        elif not stream:
+        artifacts.append(artifact)
+    is_soma = [artifact.suffix == ".tiledbsoma" for artifact in artifacts]
+    is_soma = len(artifacts) > 0 and all(is_soma)
+    if not is_soma and any(artifact.suffix == ".tiledbsoma" for artifact in artifacts):
+        raise ValueError(
+            "Can't map a collection with both tiledbsoma stores and AnnData artifacts."
+        )
+    cache_meta = cache_meta or save_meta
+    if is_soma:
+        if preload:
+            raise ValueError("`preload` is not supported for tiledbsoma stores.")
+        if cache_meta:
+            logger.warning("metadata caching is not supported for tiledbsoma stores")
+            cache_meta = False
+    meta_options = None
+    meta = None
+    meta_is_saved = False
+    if cache_meta:
+        meta_options = {
+            "hashes": [artifact.hash for artifact in artifacts],
+            "layers_keys": layers_keys,
+            "obs_keys": obs_keys,
+            "obsm_keys": obsm_keys,
+            "obs_filter": obs_filter,
+        }
+        meta, meta_is_saved = _load_mapped_meta(self, meta_options)
+    if shard is not None:
+        if join == "outer":
+            logger.warning(
+                "the outer join of variables is computed only over the artifacts"
+                " of the shard"
+            )
+        if meta is not None:
+            sizes = [
+                n_obs if indices is None else len(indices)
+                for n_obs, indices in zip(meta["n_obs"], meta["indices"])
+            ]
+        elif all(artifact.n_observations is not None for artifact in artifacts):
+            sizes = [artifact.n_observations for artifact in artifacts]
+        else:
+            sizes = [artifact.size for artifact in artifacts]
+        shard_idxs = _shard_stores(sizes, *shard)
+        artifacts = [artifacts[i] for i in shard_idxs]
+        if meta is not None:
+            meta = meta.iloc[shard_idxs].reset_index(drop=True)
+    path_list = []
+    for artifact in artifacts:
+        if not stream:
             path_list.append(artifact.cache())
         else:
             path_list.append(artifact.path)
+    if is_soma:
+        ds = SOMAMappedCollection(
+            path_list,
+            layers_keys,
+            obs_keys,
+            obsm_keys,
+            obs_filter,
+            join,
+            encode_labels,
+            unknown_label,
+            parallel,
+            dtype,
+            max_workers,
+            output,
+            var_subset,
+        )
+        # track only if successful
+        _track_run_input(self, is_run_input)
+        return ds
     ds = MappedCollection(
         path_list,
         layers_keys,
@@ -260,12 +371,171 @@ def mapped(
         cache_categories,
         parallel,
         dtype,
+        meta,
+        max_workers,
+        output,
+        preload,
+        var_subset,
     )
+    if cache_meta:
+        if meta is None and shard is not None:
+            logger.info(
+                "not caching the metadata of a shard, call `from_collection(cache_meta=True)`"
+                " without `shard` once to cache it for all shards"
+            )
+        else:
+            if meta is None:
+                _write_mapped_meta(self, ds, meta_options)
+            if save_meta and not meta_is_saved:
+                _save_mapped_meta(self)
     # track only if successful
     _track_run_input(self, is_run_input)
     return ds
 
 
+def _shard_stores(sizes: list[int], rank: int, world_size: int) -> list[int]:
+    """Assign whole stores to ranks balancing the sizes, return the stores of `rank`.
+
+    Stores are assigned from the largest to the smallest to the rank with the smallest
+    total size so far, this is deterministic and gives the same result on all ranks.
+    The returned indices keep the order of the stores in the collection.
+    """
+    if world_size < 1 or not 0 <= rank < world_size:
+        raise ValueError(
+            f"Invalid shard ({rank}, {world_size}), should be (rank, world_size)"
+            " with 0 <= rank < world_size."
+        )
+    if len(sizes) < world_size:
+        raise ValueError(
+            f"Can't shard {len(sizes)} artifacts for {world_size} ranks,"
+            " each rank should have at least one artifact."
+        )
+    totals = [0] * world_size
+    assigned: list[list[int]] = [[] for _ in range(world_size)]
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i], i)):
+        shard_rank = min(range(world_size), key=lambda r: (totals[r], r))
+        totals[shard_rank] += sizes[i]
+        assigned[shard_rank].append(i)
+    return sorted(assigned[rank])
+
+
+_MAPPED_META_KEY = b"lamindb_mapped_meta"
+
+
+def _normalize_meta_options(options: dict) -> dict:
+    normalized = {}
+    for key, value in options.items():
+        if key in {"layers_keys", "obs_keys", "obsm_keys"}:
+            value = [value] if isinstance(value, str) else value
+            if key == "layers_keys" and value is None:
+                value = ["X"]
+            value = sorted(value) if value is not None else []
+        elif key == "obs_filter" and isinstance(value, (tuple, dict)):
+            # stored options are already normalized
+            value = sorted(_parse_obs_filter(value))
+        normalized[key] = value
+    # json doesn't distinguish tuples and lists
+    return json.loads(json.dumps(normalized))
+
+
+def _mapped_meta_path(collection: Collection) -> Path:
+    return ln_setup.settings.cache_dir / f"{collection.uid}_mapped_meta.parquet"
+
+
+def _read_mapped_meta(filepath: Path, options: dict) -> pd.DataFrame | None:
+    """Read the metadata of `MappedCollection` from a file if it is up to date."""
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(filepath)
+    schema_metadata = table.schema.metadata or {}
+    if _MAPPED_META_KEY not in schema_metadata:
+        return None
+    stored = _normalize_meta_options(json.loads(schema_metadata[_MAPPED_META_KEY]))
+    requested = _normalize_meta_options(options)
+    up_to_date = (
+        stored["hashes"] == requested["hashes"]
+        and stored["obs_filter"] == requested["obs_filter"]
+        and all(
+            set(requested[key]) <= set(stored[key])
+            for key in ("layers_keys", "obs_keys", "obsm_keys")
+        )
+    )
+    return table.to_pandas() if up_to_date else None
+
+
+def _load_mapped_meta(
+    collection: Collection, options: dict
+) -> tuple[pd.DataFrame | None, bool]:
+    """Load the metadata of `MappedCollection` if it is up to date.
+
+    Looks in the local cache first and then in `meta_artifact`.
+    Returns the metadata and whether it is saved in `meta_artifact`.
+    """
+    filepath = _mapped_meta_path(collection)
+    if filepath.exists():
+        meta = _read_mapped_meta(filepath, options)
+        if meta is not None:
+            return meta, False
+    meta_artifact = collection.meta_artifact
+    if meta_artifact is None or meta_artifact.suffix != ".parquet":
+        return None, False
+    meta = _read_mapped_meta(meta_artifact.cache(is_run_input=False), options)
+    if meta is None:
+        logger.info("the metadata in meta_artifact is outdated, recomputing")
+        return None, False
+    return meta, True
+
+
+def _write_mapped_meta(
+    collection: Collection, mapped: MappedCollection, options: dict
+) -> None:
+    """Write the metadata of `MappedCollection` to the local cache."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(mapped.get_meta(), preserve_index=False)
+    table = table.replace_schema_metadata(
+        {
+            **(table.schema.metadata or {}),
+            _MAPPED_META_KEY: json.dumps(_normalize_meta_options(options)),
+        }
+    )
+    pq.write_table(table, _mapped_meta_path(collection))
+
+
+def _save_mapped_meta(collection: Collection) -> None:
+    """Save the cached metadata of `MappedCollection` as a new version of `meta_artifact`."""
+    import pyarrow.parquet as pq
+
+    if collection._state.adding:
+        logger.warning("can't save the metadata for a collection that isn't saved")
+        return None
+    meta_artifact = collection.meta_artifact
+    if meta_artifact is not None:
+        is_mapped_meta = meta_artifact.suffix == ".parquet" and (
+            _MAPPED_META_KEY
+            in (pq.read_schema(meta_artifact.cache(is_run_input=False)).metadata or {})
+        )
+        if not is_mapped_meta:
+            logger.warning(
+                "meta_artifact of the collection is not the metadata of `MappedCollection`,"
+                " not overwriting it"
+            )
+            return None
+    # registering a file in the cache directory can move it, register a copy
+    with TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / _mapped_meta_path(collection).name
+        shutil.copyfile(_mapped_meta_path(collection), filepath)
+        collection.meta_artifact = Artifact(
+            filepath,
+            description=f"Metadata of MappedCollection for collection {collection.uid}",
+            revises=meta_artifact,
+            visibility=0,  # hidden file
+            run=False,
+        ).save()
+    collection.save()
+
+
 # docstring handled through attach_func_to_class_method
 def cache(self, is_run_input: bool | None = None) -> list[UPath]:
     path_list = []
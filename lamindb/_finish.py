@@ -6,7 +6,8 @@ from typing import TYPE_CHECKING
 
 import lamindb_setup as ln_setup
 from lamin_utils import logger
-from lamindb_setup.core.hashing import hash_file
+
+from .core.storage._hash_cache import cached_hash_file
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -141,7 +142,7 @@ def save_context_core(
         notebook_to_script(transform, filepath, source_code_path)
     ln.settings.creation.artifact_silence_missing_run_warning = True
     # track source code
-    hash, _ = hash_file(source_code_path)  # ignore hash_type for now
+    hash, _ = cached_hash_file(source_code_path)  # ignore hash_type for now
     if (
         transform._source_code_artifact_id is not None
         or transform.source_code is not None  # equivalent to transform.hash is not None
@@ -178,7 +179,7 @@ def save_context_core(
             logger.important("run.environment is already saved")
             overwrite_env = False
         if overwrite_env:
-            hash, _ = hash_file(env_path)
+            hash, _ = cached_hash_file(env_path)
             artifact = ln.Artifact.filter(hash=hash, visibility=0).one_or_none()
             new_env_artifact = artifact is None
             if new_env_artifact:
@@ -203,7 +204,7 @@ def save_context_core(
         run.save()
     else:
         if run.report_id is not None:
-            hash, _ = hash_file(report_path)  # ignore hash_type for now
+            hash, _ = cached_hash_file(report_path)  # ignore hash_type for now
             if hash != run.report.hash:
                 response = input(
                     f"You are about to overwrite an existing report (hash '{run.report.hash}') for Run('{run.uid}'). Proceed? (y/n)"
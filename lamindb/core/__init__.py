@@ -49,6 +49,9 @@ Data loaders:
    :toctree: .
 
    MappedCollection
+   SOMAMappedCollection
+   IterableMappedCollection
+   BlockShuffleSampler
 
 Modules:
 
@@ -94,5 +97,8 @@ from lamindb.core._label_manager import LabelManager
 
 from . import _data, datasets, exceptions, fields, loaders, subsettings, types
 from ._context import Context
+from ._iterable_collection import IterableMappedCollection
 from ._mapped_collection import MappedCollection
+from ._samplers import BlockShuffleSampler
 from ._settings import Settings
+from ._soma_mapped_collection import SOMAMappedCollection
@@ -8,7 +8,6 @@ from typing import TYPE_CHECKING
 
 import lamindb_setup as ln_setup
 from lamin_utils import logger
-from lamindb_setup.core.hashing import hash_file
 from lnschema_core import Run, Transform, ids
 from lnschema_core.ids import base62_12
 from lnschema_core.models import format_field_value
@@ -24,6 +23,7 @@ from .exceptions import (
     TrackNotCalled,
     UpdateContext,
 )
+from .storage._hash_cache import cached_hash_file
 from .subsettings._transform_settings import transform_settings
 from .versioning import bump_version as bump_version_function
 from .versioning import increment_base62, message_update_key_in_version_family
@@ -526,7 +526,7 @@ class Context:
                 if is_run_from_ipython:
                     bump_revision = True
                 else:
-                    hash, _ = hash_file(self._path)  # ignore hash_type for now
+                    hash, _ = cached_hash_file(self._path)  # ignore hash_type for now
                     if transform.hash is not None:
                         condition = hash != transform.hash
                     else:
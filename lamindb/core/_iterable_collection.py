@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from typing import TYPE_CHECKING
+
+import numpy as np
+from scipy.sparse import issparse
+from scipy.sparse import vstack as sparse_vstack
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from ._mapped_collection import MappedCollection
+
+_DONE = object()
+
+
+def _register_torch_iterable(cls: type):
+    """Make `torch.utils.data.DataLoader` treat `cls` as an iterable-style dataset."""
+    try:
+        from torch.utils.data import IterableDataset
+    except ImportError:
+        return
+    if not issubclass(cls, IterableDataset):
+        IterableDataset.register(cls)
+
+
+def _get_worker() -> tuple[int, int]:
+    """Get the id of the data loader worker and the number of workers."""
+    try:
+        from torch.utils.data import get_worker_info
+    except ImportError:
+        return 0, 1
+    worker_info = get_worker_info()
+    if worker_info is None:
+        return 0, 1
+    return worker_info.id, worker_info.num_workers
+
+
+def _put(out_queue: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put an item into the queue, give up if `stop` is set."""
+    while not stop.is_set():
+        try:
+            out_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _concat_batches(batches: list[dict]) -> dict:
+    concatenated = {}
+    for key in batches[0]:
+        values = [batch[key] for batch in batches]
+        if issparse(values[0]):
+            concatenated[key] = sparse_vstack(values, format="csr")
+        else:
+            concatenated[key] = np.concatenate(values)
+    return concatenated
+
+
+class IterableMappedCollection:
+    """Iterable-style dataset streaming the observations of a `MappedCollection`.
+
+    Reads the underlying `AnnData` objects in contiguous chunks of ``chunk_size``
+    observations on a background thread, so that reading overlaps with the
+    consumption of the observations. At most ``prefetch`` chunks are read ahead.
+    If ``shuffle=True``, the order of the chunks is shuffled and then
+    the observations are shuffled within a buffer of ``buffer_size`` observations.
+
+    The observations are dictionaries as returned by `MappedCollection`,
+    labels, joins and ``dtype`` are the same. Chunks never span several `AnnData` objects.
+
+    With `torch.utils.data.DataLoader`, it is an iterable-style dataset and
+    the chunks are split between the workers.
+
+    Args:
+        mapped: A `MappedCollection` object to stream, for example from
+            :meth:`~lamindb.Collection.mapped` with ``stream=True``.
+        chunk_size: The number of consecutive observations to read at once.
+        buffer_size: The number of observations to shuffle together.
+            Defaults to ``4 * chunk_size``.
+        shuffle: Shuffle the order of the chunks and the observations within the buffer.
+        prefetch: The maximum number of chunks to read ahead.
+        seed: The seed for the random number generator.
+
+    Examples:
+        >>> from torch.utils.data import DataLoader
+        >>> mapped = collection.mapped(obs_keys="cell_type", stream=True)
+        >>> iterable = ln.core.IterableMappedCollection(mapped, chunk_size=1024)
+        >>> dl = DataLoader(iterable, batch_size=128, num_workers=2)
+    """
+
+    def __init__(
+        self,
+        mapped: MappedCollection,
+        chunk_size: int = 1024,
+        buffer_size: int | None = None,
+        shuffle: bool = True,
+        prefetch: int = 2,
+        seed: int = 0,
+    ):
+        if chunk_size < 1:
+            raise ValueError("`chunk_size` should be a positive integer.")
+        if prefetch < 1:
+            raise ValueError("`prefetch` should be a positive integer.")
+        _register_torch_iterable(type(self))
+        self.mapped = mapped
+        self.chunk_size = chunk_size
+        self.buffer_size = 4 * chunk_size if buffer_size is None else buffer_size
+        self.shuffle = shuffle
+        self.prefetch = prefetch
+        self.seed = seed
+        self.epoch = 0
+        # the process which opened the connections of mapped
+        self._pid = os.getpid()
+
+        # split the observations of each storage into chunks
+        offsets = np.cumsum([0] + list(mapped.n_obs_list))
+        chunk_starts = [
+            np.arange(start, end, chunk_size)
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+        self.chunk_starts = np.concatenate(chunk_starts).astype(np.int64)
+        chunk_ends = [
+            np.minimum(starts + chunk_size, end)
+            for starts, end in zip(chunk_starts, offsets[1:])
+        ]
+        self.chunk_ends = np.concatenate(chunk_ends).astype(np.int64)
+
+    def set_epoch(self, epoch: int):
+        """Set the epoch to get a different order of samples for each epoch."""
+        self.epoch = epoch
+
+    def __len__(self):
+        return len(self.mapped)
+
+    def __iter__(self) -> Iterator[dict]:
+        worker_id, num_workers = _get_worker()
+        if os.getpid() != self._pid:
+            # connections can't be shared with worker processes
+            self.mapped._reconnect()
+            self._pid = os.getpid()
+        rng = np.random.default_rng((self.seed, self.epoch))
+        self.epoch += 1
+
+        chunks = np.arange(len(self.chunk_starts))
+        if self.shuffle:
+            chunks = rng.permutation(chunks)
+        chunks = chunks[worker_id::num_workers]
+        # different workers shuffle the buffer differently
+        rng = np.random.default_rng((self.seed, self.epoch - 1, worker_id))
+
+        out_queue: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        reader = threading.Thread(
+            target=self._read_chunks, args=(chunks, out_queue, stop), daemon=True
+        )
+        reader.start()
+        try:
+            buffer: list[dict] = []
+            n_buffered = 0
+            while True:
+                batch = out_queue.get()
+                if batch is _DONE:
+                    break
+                if isinstance(batch, BaseException):
+                    raise batch
+                buffer.append(batch)
+                n_buffered += len(batch["_store_idx"])
+                if n_buffered >= self.buffer_size:
+                    yield from self._iter_buffer(buffer, rng)
+                    buffer, n_buffered = [], 0
+            if buffer:
+                yield from self._iter_buffer(buffer, rng)
+        finally:
+            stop.set()
+            reader.join()
+
+    def _read_chunks(
+        self, chunks: np.ndarray, out_queue: queue.Queue, stop: threading.Event
+    ):
+        try:
+            for chunk in chunks:
+                if stop.is_set():
+                    return
+                idxs = np.arange(self.chunk_starts[chunk], self.chunk_ends[chunk])
+                if not _put(out_queue, self.mapped._get_batch(idxs), stop):
+                    return
+        except Exception as e:
+            _put(out_queue, e, stop)
+            return
+        _put(out_queue, _DONE, stop)
+
+    def _iter_buffer(self, buffer: list[dict], rng: np.random.Generator):
+        batch = _concat_batches(buffer) if len(buffer) > 1 else buffer[0]
+        n_obs = len(batch["_store_idx"])
+        order = rng.permutation(n_obs) if self.shuffle else range(n_obs)
+        for i in order:
+            yield {key: value[i] for key, value in batch.items()}
+
+    def close(self):
+        """Close connections of the underlying `MappedCollection`."""
+        self.mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
-from collections import Counter
+import os
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from functools import reduce
+from multiprocessing.shared_memory import SharedMemory
 from pathlib import Path
-from typing import TYPE_CHECKING, Literal
+from typing import TYPE_CHECKING, Callable, Literal
 
 import numpy as np
 import pandas as pd
 from lamin_utils import logger
+from lamindb_setup.core.hashing import hash_and_encode_as_b62
 from lamindb_setup.core.upath import UPath
+from scipy.sparse import csc_matrix, csr_matrix, issparse
+from scipy.sparse import vstack as sparse_vstack
 
 from .storage._anndata_accessor import (
     ArrayType,
@@ -16,13 +24,17 @@ from .storage._anndata_accessor import (
     GroupType,
     GroupTypes,
     StorageType,
+    _read_spans,
     _safer_read_index,
     get_spec,
     registry,
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from lamindb_setup.core.types import UPathStr
+    from lnschema_core.models import Collection
 
 
 class _Connect:
@@ -49,9 +61,220 @@ class _Connect:
             self.conn.close()
 
 
+# dense arrays, numpy arrays hold preloaded data
+_DenseTypes = (*ArrayTypes, np.ndarray)  # type: ignore
+
 _decode = np.frompyfunc(lambda x: x.decode("utf-8"), 1, 1)
 
 
+def _map_ordered(func: Callable, iterable: Iterable, max_workers: int | None) -> list:
+    """Apply `func` to the elements on a thread pool and return results in order."""
+    items = list(iterable)
+    if max_workers == 1 or len(items) < 2:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, items))
+
+
+def _to_shared(array: np.ndarray) -> tuple[SharedMemory, np.ndarray]:
+    """Copy an array to a new shared memory block and return a read-only view of it."""
+    shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    shared[...] = array
+    shared.flags.writeable = False
+    return shm, shared
+
+
+def _attach_shared(
+    shm_name: str, shape: tuple, dtype: str
+) -> tuple[SharedMemory, np.ndarray]:
+    """Attach to an existing shared memory block and return a read-only view of it."""
+    shm = SharedMemory(name=shm_name)
+    shared = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    shared.flags.writeable = False
+    return shm, shared
+
+
+def _release_shared(shms: list[SharedMemory], owner_pid: int):
+    for shm in shms:
+        try:
+            shm.close()
+        except BufferError:
+            # views of the block are still referenced, it is unmapped with them
+            pass
+        # only the process which created the blocks removes them
+        if os.getpid() == owner_pid:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class _PreloadedGroup(dict):
+    """In-memory replacement of a sparse matrix group with the same interface."""
+
+    def __init__(self, elems: dict[str, np.ndarray], attrs: dict):
+        super().__init__(elems)
+        self.attrs = attrs
+
+
+# rows in a decoded block of a csc matrix and the number of cached blocks per matrix
+_CSC_BLOCK_SIZE = 4096
+_CSC_MAX_BLOCKS = 8
+
+
+def _parse_obs_filter(obs_filter: tuple | dict) -> list[tuple[str, bool, str, list]]:
+    """Parse `obs_filter` into a list of `(column, negate, kind, values)` conditions.
+
+    `kind` is `"isin"` with the selected values or `"range"` with the bounds.
+    """
+    if isinstance(obs_filter, tuple):
+        if len(obs_filter) != 2:
+            raise ValueError(
+                "obs_filter should be a tuple with obs column name "
+                "as the first element and filtering values as the second element"
+            )
+        obs_filter = {obs_filter[0]: obs_filter[1]}
+    if not isinstance(obs_filter, dict) or len(obs_filter) == 0:
+        raise ValueError(
+            "obs_filter should be a tuple or a non-empty dictionary of obs column names"
+            " and filtering values"
+        )
+    conditions = []
+    for key, condition in obs_filter.items():
+        negate = key.startswith("~")
+        column = key[1:] if negate else key
+        if isinstance(condition, slice):
+            if condition.step is not None:
+                raise ValueError(
+                    f"The range for {key} in obs_filter can't have a step."
+                )
+            conditions.append(
+                (column, negate, "range", [condition.start, condition.stop])
+            )
+        else:
+            values = (
+                list(condition)
+                if isinstance(condition, (tuple, list, set, np.ndarray))
+                else [condition]
+            )
+            values = [
+                value.item() if hasattr(value, "item") else value for value in values
+            ]
+            conditions.append((column, negate, "isin", values))
+    return conditions
+
+
+def _select_values(values: np.ndarray, kind: str, condition: list) -> np.ndarray:
+    if kind == "isin":
+        return np.isin(values, condition)
+    start, stop = condition
+    selected = np.ones(len(values), dtype=bool)
+    if start is not None:
+        selected &= values >= start
+    if stop is not None:
+        selected &= values < stop
+    return selected
+
+
+def _read_points(elem: ArrayType | np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Read the elements at the strictly increasing positions of a 1d array."""
+    if hasattr(elem, "get_coordinate_selection"):  # zarr
+        return elem.get_coordinate_selection(points)
+    return elem[points]
+
+
+class _CSCRowBlocks:
+    """Read blocks of rows of a csc matrix through its column pointers.
+
+    Only `indptr` is kept in memory. For a block of rows, the positions of the rows
+    in each column are found by a binary search over `indices`, run for all columns
+    at once, and the entries are read with coalesced requests.
+    The decoded blocks are cached as `csr_matrix`, the least recently used ones
+    are dropped. The row indices in each column have to be sorted.
+    """
+
+    def __init__(self, group: GroupType, block_size: int, max_blocks: int):
+        self.shape = tuple(group.attrs["shape"])
+        self.indptr = group["indptr"][...].astype(np.int64)
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self._blocks: OrderedDict[int, csr_matrix] = OrderedDict()
+
+    def _search(self, indices: ArrayType, row: int, lo: np.ndarray) -> np.ndarray:
+        """First position with a row index `>= row` in each column, starting from `lo`."""
+        lo = lo.copy()
+        hi = self.indptr[1:].copy()
+        active = np.flatnonzero(lo < hi)
+        while len(active) > 0:
+            mid = (lo[active] + hi[active]) // 2
+            right = _read_points(indices, mid) < row
+            lo[active[right]] = mid[right] + 1
+            hi[active[~right]] = mid[~right]
+            active = active[lo[active] < hi[active]]
+        return lo
+
+    def _read_block(self, group: GroupType, block: int) -> csr_matrix:
+        start = block * self.block_size
+        end = min(start + self.block_size, self.shape[0])
+        indices = group["indices"]
+        lo = self._search(indices, start, self.indptr[:-1])
+        hi = self._search(indices, end, lo)
+        lengths = hi - lo
+        cols = np.repeat(np.arange(self.shape[1]), lengths)
+        nonempty = lengths > 0
+        if not nonempty.any():
+            return csr_matrix((end - start, self.shape[1]), dtype=group["data"].dtype)
+        starts, ends = lo[nonempty], hi[nonempty]
+        data, offsets = _read_spans(group["data"], starts, ends)
+        rows, _ = _read_spans(indices, starts, ends)
+        # the spans are contiguous in the read data if they are merged
+        lengths = lengths[nonempty]
+        cum_lengths = np.cumsum(lengths)
+        gather = np.arange(cum_lengths[-1])
+        gather += np.repeat(offsets - cum_lengths + lengths, lengths)
+        return csr_matrix(
+            (data[gather], (rows[gather] - start, cols)),
+            shape=(end - start, self.shape[1]),
+        )
+
+    def get_rows(self, group: GroupType, rows: np.ndarray) -> csr_matrix:
+        """Get the sorted unique rows as a `csr_matrix`."""
+        blocks = rows // self.block_size
+        parts = []
+        for block in np.unique(blocks):
+            block = int(block)
+            if block in self._blocks:
+                self._blocks.move_to_end(block)
+            else:
+                self._blocks[block] = self._read_block(group, block)
+                if len(self._blocks) > self.max_blocks:
+                    self._blocks.popitem(last=False)
+            block_rows = rows[blocks == block] - block * self.block_size
+            parts.append(self._blocks[block][block_rows])
+        return parts[0] if len(parts) == 1 else sparse_vstack(parts, format="csr")
+
+
+class _CSCRows:
+    """A csc matrix group bound to its reader of row blocks."""
+
+    def __init__(self, group: GroupType, reader: _CSCRowBlocks):
+        self.group = group
+        self.reader = reader
+
+    def to_csr_group(self, rows: np.ndarray) -> _PreloadedGroup:
+        """Get the sorted unique rows as an in-memory csr matrix group."""
+        rows_csr = self.reader.get_rows(self.group, rows)
+        return _PreloadedGroup(
+            {
+                "data": rows_csr.data,
+                "indices": rows_csr.indices,
+                "indptr": rows_csr.indptr,
+            },
+            {"shape": rows_csr.shape},
+        )
+
+
 class MappedCollection:
     """Map-style collection for use in data loaders.
 
@@ -67,12 +290,16 @@ class MappedCollection:
     (`.X` is in `"X"`), `obs_keys`, `obsm_keys` (under `f"obsm_{key}"`) and also `"_store_idx"`
     for the index of the `AnnData` object containing this observation sample.
 
+    `__getitems__` takes a list of integer indices and returns a list of such dictionaries.
+    It reads all observations from the same `AnnData` object in bulk and is used by
+    `torch.utils.data.DataLoader` for batched sampling.
+
     .. note::
 
         For a guide, see :doc:`docs:scrna-mappedcollection`.
 
         For more convenient use within :class:`~lamindb.core.MappedCollection`,
-        see :meth:`~lamindb.Collection.mapped`.
+        see :meth:`~lamindb.Collection.mapped` and :meth:`from_collection`.
 
         This currently only works for collections of `AnnData` objects.
 
@@ -89,6 +316,12 @@ class MappedCollection:
         obs_filter: Select only observations with these values for the given obs column.
             Should be a tuple with an obs column name as the first element
             and filtering values (a string or a tuple of strings) as the second element.
+            Can also be a dictionary with obs column names as keys to select observations
+            which satisfy all conditions. A value can be a single value or a tuple of values
+            to select or a `slice` to select the numeric range ``start <= x < stop``.
+            Prefix a column name with ``"~"`` to exclude the observations instead.
+            For example, ``{"tissue": ("lung", "liver"), "n_genes": slice(200, None),
+            "~doublet": "True"}``. Categorical columns are filtered on their codes.
         join: `"inner"` or `"outer"` virtual joins. If ``None`` is passed,
             does not join.
         encode_labels: Encode labels into integers.
@@ -98,34 +331,60 @@ class MappedCollection:
             or from ``encode_labels`` if it is a list.
         cache_categories: Enable caching categories of ``obs_keys`` for faster access.
         parallel: Enable sampling with multiple processes.
+            The indices of the observations are moved to shared memory,
+            so that worker processes attach to them instead of copying.
         dtype: Convert numpy arrays from ``.X``, ``.layers`` and ``.obsm``
+        meta: Metadata of the `AnnData` objects as returned by :meth:`get_meta`
+            for the same ``path_list``, ``obs_filter`` and ``obs_keys``.
+            If passed, the metadata is not read from the objects.
+        max_workers: The maximum number of threads to open the objects and read their
+            metadata concurrently. ``None`` uses the default of `ThreadPoolExecutor`,
+            ``1`` reads the objects one after another.
+        output: Return ``.X`` and ``.layers`` as dense numpy arrays (``"dense"``) or as
+            `scipy.sparse.csr_matrix` rows (``"csr"``). With ``"csr"``, sparse rows are
+            not densified, use :meth:`collate_csr` as `collate_fn` of the data loader.
+        preload: Load ``layers_keys`` and ``obsm_keys`` of all objects into memory.
+            Sparse matrices are kept as their ``data``, ``indices`` and ``indptr`` arrays.
+            Only use it if the arrays fit into memory.
+        var_subset: Return only these variables of ``.X`` and ``.layers`` in this order.
+            Only the selected columns are read from dense arrays and scattered from
+            sparse rows. Variables missing in an object are filled with zeros,
+            with ``join="inner"`` only the variables present in all objects are kept.
     """
 
+    # arrays of size n_obs which are moved to shared memory with parallel=True,
+    # "attr/key" refers to an array in a dictionary attribute
+    _shared_arrays: tuple[str, ...] = ("indices", "storage_idx")
+
     def __init__(
         self,
         path_list: list[UPathStr],
         layers_keys: str | list[str] | None = None,
         obs_keys: str | list[str] | None = None,
         obsm_keys: str | list[str] | None = None,
-        obs_filter: tuple[str, str | tuple[str, ...]] | None = None,
+        obs_filter: tuple[str, str | tuple[str, ...]] | dict | None = None,
         join: Literal["inner", "outer"] | None = "inner",
         encode_labels: bool | list[str] = True,
         unknown_label: str | dict[str, str] | None = None,
         cache_categories: bool = True,
         parallel: bool = False,
         dtype: str | None = None,
+        meta: pd.DataFrame | None = None,
+        max_workers: int | None = None,
+        output: Literal["dense", "csr"] = "dense",
+        preload: bool = False,
+        var_subset: pd.Index | list[str] | None = None,
     ):
         if join not in {None, "inner", "outer"}:  # pragma: nocover
             raise ValueError(
                 f"join must be one of None, 'inner, or 'outer' but was {type(join)}"
             )
+        if output not in {"dense", "csr"}:
+            raise ValueError(f"output must be one of 'dense' or 'csr' but was {output}")
+        self._output = output
 
         self.filtered = obs_filter is not None
-        if self.filtered and len(obs_filter) != 2:
-            raise ValueError(
-                "obs_filter should be a tuple with obs column name "
-                "as the first element and filtering values as the second element"
-            )
+        obs_filter = _parse_obs_filter(obs_filter) if self.filtered else None
 
         if layers_keys is None:
             self.layers_keys = ["X"]
@@ -165,101 +424,555 @@ class MappedCollection:
         self.conns = []  # type: ignore
         self.parallel = parallel
         self.path_list = path_list
+        self._max_workers = max_workers
+        self._shms: dict[str, SharedMemory] = {}
+        self._shms_finalizer: weakref.finalize | None = None
+        self._csc_readers: dict[tuple[int, str, str], _CSCRowBlocks | None] = {}
         self._make_connections(path_list, parallel)
 
-        self._cache_cats: dict = {}
-        if self.obs_keys is not None:
-            if cache_categories:
-                self._cache_categories(self.obs_keys)
-            self.encoders: dict = {}
-            if self.encode_labels:
-                self._make_encoders(self.encode_labels)  # type: ignore
+        self.n_obs_list: list = []
+        self.indices_list: list = []
+        self.n_vars_list: list | None = None
+        self.var_list: list | None = None
 
-        self.n_obs_list = []
-        self.indices_list = []
-        for i, storage in enumerate(self.storages):
-            with _Connect(storage) as store:
-                X = store["X"]
-                store_path = self.path_list[i]
-                self._check_csc_raise_error(X, "X", store_path)
-                if self.filtered:
-                    obs_filter_key, obs_filter_values = obs_filter
-                    indices_storage = np.where(
-                        np.isin(
-                            self._get_labels(store, obs_filter_key), obs_filter_values
-                        )
-                    )[0]
-                    n_obs_storage = len(indices_storage)
-                else:
-                    if isinstance(X, ArrayTypes):  # type: ignore
-                        n_obs_storage = X.shape[0]
-                    else:
-                        n_obs_storage = X.attrs["shape"][0]
-                    indices_storage = np.arange(n_obs_storage)
-                self.n_obs_list.append(n_obs_storage)
-                self.indices_list.append(indices_storage)
-                for layer_key in self.layers_keys:
-                    if layer_key == "X":
-                        continue
-                    self._check_csc_raise_error(
-                        store["layers"][layer_key],
-                        f"layers/{layer_key}",
-                        store_path,
-                    )
-                if self.obsm_keys is not None:
-                    for obsm_key in self.obsm_keys:
-                        self._check_csc_raise_error(
-                            store["obsm"][obsm_key],
-                            f"obsm/{obsm_key}",
-                            store_path,
-                        )
+        self._cache_cats: dict = {}
+        # labels are stored as integer codes into the sorted merged categories
+        self._label_cats: dict[str, np.ndarray] = {}
+        self._label_codes: dict[str, np.ndarray] = {}
+        if meta is not None:
+            self._set_meta(meta)
+        elif self.obs_keys is not None and cache_categories:
+            self._cache_categories(self.obs_keys)
+
+        if meta is None:
+            try:
+                self.indices_list = _map_ordered(
+                    lambda i: self._read_obs_indices(i, obs_filter),
+                    range(len(self.storages)),
+                    self._max_workers,
+                )
+            except ValueError:
+                # close only after all the reads are done
+                if not self.parallel:
+                    self.close()
+                raise
+            self.n_obs_list = [len(indices) for indices in self.indices_list]
         self.n_obs = sum(self.n_obs_list)
 
         self.indices = np.hstack(self.indices_list)
         self.storage_idx = np.repeat(np.arange(len(self.storages)), self.n_obs_list)
 
+        if self.obs_keys is not None:
+            # the codes of the labels are read on first use,
+            # or now to share them with the worker processes
+            if self.parallel:
+                self._make_label_codes(
+                    [label for label in self.obs_keys if label not in self._label_codes]
+                )
+            self.encoders: dict = {}
+            self._encoded_codes: dict[str, np.ndarray] = {}
+            if self.encode_labels:
+                self._make_encoders(self.encode_labels)  # type: ignore
+
         self.join_vars: Literal["inner", "outer"] | None = join
         self.var_indices: list | None = None
         self.var_joint: pd.Index | None = None
-        self.n_vars_list: list | None = None
-        self.var_list: list | None = None
         self.n_vars: int | None = None
-        if self.join_vars is not None:
+        # columns to read and their positions in the output for var_subset
+        self._var_selects: list[tuple[np.ndarray, np.ndarray, np.ndarray]] | None = None
+        if var_subset is not None:
+            self._make_var_subset(var_subset)
+        elif self.join_vars is not None:
             self._make_join_vars()
             self.n_vars = len(self.var_joint)
 
         self._dtype = dtype
         self._closed = False
 
+        self._preloaded: list[dict] | None = None
+        if preload:
+            self._preload()
+
+        if self.parallel:
+            self._share_arrays()
+
+    def _shared_names(self) -> list[str]:
+        names = list(self._shared_arrays)
+        names += [f"_label_codes/{label}" for label in self._label_codes]
+        return names
+
+    def _get_shared(self, name: str) -> np.ndarray:
+        attr, _, key = name.partition("/")
+        return getattr(self, attr)[key] if key else getattr(self, attr)
+
+    def _set_shared(self, name: str, array: np.ndarray | None):
+        attr, _, key = name.partition("/")
+        if key:
+            getattr(self, attr)[key] = array
+        else:
+            setattr(self, attr, array)
+
+    def _share_arrays(self):
+        """Move the arrays of size `n_obs` to shared memory."""
+        for name in self._shared_names():
+            shm, shared = _to_shared(self._get_shared(name))
+            self._shms[name] = shm
+            self._set_shared(name, shared)
+        self._split_indices()
+        self._shms_finalizer = weakref.finalize(
+            self, _release_shared, list(self._shms.values()), os.getpid()
+        )
+
+    def _unshare_arrays(self):
+        """Copy the arrays back from shared memory and release it."""
+        if not self._shms:
+            return
+        for name in self._shms:
+            self._set_shared(name, np.array(self._get_shared(name)))
+        self._split_indices()
+        self._shms = {}
+        self._shms_finalizer()  # type: ignore
+
+    def _split_indices(self):
+        offsets = np.cumsum([0] + self.n_obs_list)
+        self.indices_list = [
+            self.indices[start:end] for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # pass only the names of the shared memory blocks to worker processes
+        shared = {}
+        for name, shm in self._shms.items():
+            array = self._get_shared(name)
+            shared[name] = (shm.name, array.shape, array.dtype.str)
+        state["_shms"] = shared
+        if self._shms:
+            state["indices"] = state["storage_idx"] = state["indices_list"] = None
+            state["_label_codes"] = dict.fromkeys(self._label_codes)
+        state["_shms_finalizer"] = None
+        return state
+
+    def __setstate__(self, state):
+        shared = state.pop("_shms")
+        self.__dict__.update(state)
+        self._shms = {}
+        for name, (shm_name, shape, dtype) in shared.items():
+            shm, array = _attach_shared(shm_name, shape, dtype)
+            self._shms[name] = shm
+            self._set_shared(name, array)
+        if self._shms:
+            self._split_indices()
+            # the creator of the blocks unlinks them, here they are only closed
+            self._shms_finalizer = weakref.finalize(
+                self, _release_shared, list(self._shms.values()), -1
+            )
+
+    def _preload(self):
+        """Load the arrays of `layers_keys` and `obsm_keys` into memory."""
+
+        def load(elem):
+            if isinstance(elem, ArrayTypes):  # type: ignore
+                data = elem[...]
+                return data if self._dtype is None else data.astype(self._dtype)
+            data = elem["data"][...]
+            indices, indptr = elem["indices"][...], elem["indptr"][...]
+            shape = tuple(elem.attrs["shape"])
+            if get_spec(elem).encoding_type == "csc_matrix":
+                matrix = csc_matrix((data, indices, indptr), shape=shape).tocsr()
+                data, indices, indptr = matrix.data, matrix.indices, matrix.indptr
+            return _PreloadedGroup(
+                {
+                    "data": data if self._dtype is None else data.astype(self._dtype),
+                    "indices": indices,
+                    "indptr": indptr,
+                },
+                {"shape": shape},
+            )
+
+        def preload_storage(storage):
+            with _Connect(storage) as store:
+                preloaded: dict = {"layers": {}, "obsm": {}}
+                for layers_key in self.layers_keys:
+                    if layers_key == "X":
+                        preloaded["X"] = load(store["X"])
+                    else:
+                        preloaded["layers"][layers_key] = load(
+                            store["layers"][layers_key]
+                        )
+                if self.obsm_keys is not None:
+                    for obsm_key in self.obsm_keys:
+                        preloaded["obsm"][obsm_key] = load(store["obsm"][obsm_key])
+            return preloaded
+
+        self._preloaded = _map_ordered(
+            preload_storage, self.storages, self._max_workers
+        )
+
+    def _get_lazy_data(
+        self, store: StorageType, storage_idx: int, key: str, slot: str = "layers"
+    ):
+        """Get an array from `.X`, `.layers` or `.obsm`, csc matrices read by row blocks."""
+        elem = store["X"] if slot == "layers" and key == "X" else store[slot][key]  # type: ignore
+        if not isinstance(elem, GroupTypes):  # type: ignore
+            return elem
+        reader_key = (storage_idx, slot, key)
+        if reader_key not in self._csc_readers:
+            if get_spec(elem).encoding_type == "csc_matrix":
+                reader = _CSCRowBlocks(elem, _CSC_BLOCK_SIZE, _CSC_MAX_BLOCKS)
+            else:
+                reader = None
+            self._csc_readers[reader_key] = reader
+        reader = self._csc_readers[reader_key]
+        return elem if reader is None else _CSCRows(elem, reader)
+
+    def _connect(self, storage_idx: int):
+        if self._preloaded is not None:
+            return nullcontext(self._preloaded[storage_idx])
+        return _Connect(self.storages[storage_idx])
+
     def _make_connections(self, path_list: list, parallel: bool):
-        for path in path_list:
+        def connect(path):
             path = UPath(path)
             if path.exists() and path.is_file():  # type: ignore
                 if parallel:
-                    conn, storage = None, path
+                    return None, path
                 else:
-                    conn, storage = registry.open("h5py", path)
+                    return registry.open("h5py", path)
             else:
-                conn, storage = registry.open("zarr", path)
+                return registry.open("zarr", path)
+
+        for conn, storage in _map_ordered(connect, path_list, self._max_workers):
             self.conns.append(conn)
             self.storages.append(storage)
 
+    def _read_obs_indices(self, storage_idx: int, obs_filter: list | None):
+        """Get the indices of the selected observations."""
+        with _Connect(self.storages[storage_idx]) as store:
+            n_obs_storage = self._read_n_obs(store, storage_idx)
+            if obs_filter is None:
+                return np.arange(n_obs_storage)
+            selected = np.ones(n_obs_storage, dtype=bool)
+            for column, negate, kind, condition in obs_filter:
+                selected_column = self._select_obs(
+                    store, storage_idx, column, kind, condition
+                )
+                selected &= ~selected_column if negate else selected_column
+        return np.flatnonzero(selected)
+
+    def _read_n_obs(self, store: StorageType, storage_idx: int) -> int:
+        """Get the number of observations in a store."""
+        X = store["X"]
+        if isinstance(X, ArrayTypes):  # type: ignore
+            return X.shape[0]
+        return X.attrs["shape"][0]
+
+    def _get_chunk_rows(self, storage_idx: int) -> int | None:
+        """Number of observations in a chunk of the first layer of a storage if chunked."""
+        layers_key = self.layers_keys[0]
+        with _Connect(self.storages[storage_idx]) as store:
+            elem = store["X"] if layers_key == "X" else store["layers"][layers_key]
+            if isinstance(elem, ArrayTypes):  # type: ignore
+                chunks = getattr(elem, "chunks", None)
+                if chunks is not None:
+                    return chunks[0]
+        return None
+
+    def _select_obs(
+        self,
+        store: StorageType,
+        storage_idx: int,
+        column: str,
+        kind: str,
+        condition: list,
+    ) -> np.ndarray:
+        """Select the observations satisfying the condition for an obs column."""
+        codes = self._get_codes(store, column)
+        if column in self._cache_cats:
+            cats = self._cache_cats[column][storage_idx]
+        else:
+            cats = self._get_categories(store, column)
+        if cats is None:
+            is_bytes = len(codes) > 0 and isinstance(codes[0], bytes)
+            return _select_values(
+                _decode(codes) if is_bytes else codes, kind, condition
+            )
+        cats = _decode(cats) if isinstance(cats[0], bytes) else cats[...]
+        # select the categories once and look up the codes, -1 is never selected
+        selected_cats = _select_values(np.asarray(cats), kind, condition)
+        return np.append(selected_cats, False)[codes]
+
+    @classmethod
+    def from_collection(
+        cls,
+        collection: Collection,
+        layers_keys: str | list[str] | None = None,
+        obs_keys: str | list[str] | None = None,
+        obsm_keys: str | list[str] | None = None,
+        obs_filter: tuple[str, str | tuple[str, ...]] | dict | None = None,
+        join: Literal["inner", "outer"] | None = "inner",
+        encode_labels: bool | list[str] = True,
+        unknown_label: str | dict[str, str] | None = None,
+        cache_categories: bool = True,
+        parallel: bool = False,
+        dtype: str | None = None,
+        stream: bool = False,
+        cache_meta: bool = False,
+        save_meta: bool = False,
+        max_workers: int | None = None,
+        output: Literal["dense", "csr"] = "dense",
+        shard: tuple[int, int] | None = None,
+        preload: bool = False,
+        var_subset: pd.Index | list[str] | None = None,
+        is_run_input: bool | None = None,
+    ) -> MappedCollection:
+        """Map the artifacts of a collection, with all options of the data loaders.
+
+        Like :meth:`~lamindb.Collection.mapped`, but also exposes the options for
+        metadata caching, sharding, sparse output, preloading and variable subsets.
+        Collections of `.tiledbsoma` stores give a
+        :class:`~lamindb.core.SOMAMappedCollection`, which doesn't support
+        ``cache_categories``, ``cache_meta`` and ``preload``.
+
+        Args:
+            collection: A collection of `.h5ad`, `.zarr` or `.tiledbsoma` artifacts,
+                artifacts with other suffixes are ignored.
+            layers_keys: Keys from the ``.layers`` slot. ``layers_keys=None`` or ``"X"``
+                in the list retrieves ``.X``.
+            obs_keys: Keys from the ``.obs`` slots.
+            obsm_keys: Keys from the ``.obsm`` slots.
+            obs_filter: Select only observations with these values for obs columns,
+                see :class:`~lamindb.core.MappedCollection`.
+            join: `"inner"` or `"outer"` virtual joins. If ``None`` is passed,
+                does not join.
+            encode_labels: Encode labels into integers.
+                Can be a list with elements from ``obs_keys``.
+            unknown_label: Encode this label to -1.
+                Can be a dictionary with keys from ``obs_keys`` if ``encode_labels=True``
+                or from ``encode_labels`` if it is a list.
+            cache_categories: Enable caching categories of ``obs_keys`` for faster access.
+            parallel: Enable sampling with multiple processes.
+            dtype: Convert numpy arrays from ``.X``, ``.layers`` and ``.obsm``
+            stream: Whether to stream data from the array backend.
+            cache_meta: Reuse the metadata of the artifacts, see :meth:`get_meta`,
+                from the local cache or from ``collection.meta_artifact`` if it is
+                up to date. Otherwise, read the metadata and write it to the local cache.
+                Doesn't change the collection.
+            save_meta: Like ``cache_meta``, but also save the metadata as a new version
+                of ``collection.meta_artifact`` to reuse it on other machines.
+                Saves the collection.
+            max_workers: The maximum number of threads to open the artifacts and read
+                their metadata concurrently.
+            output: Return ``.X`` and ``.layers`` as dense arrays (``"dense"``) or as
+                `scipy.sparse.csr_matrix` rows (``"csr"``).
+            shard: A tuple ``(rank, world_size)`` to map only the artifacts of this rank,
+                whole artifacts are assigned to ranks balancing their sizes.
+            preload: Load ``layers_keys`` and ``obsm_keys`` of all artifacts into memory.
+            var_subset: Return only these variables of ``.X`` and ``.layers`` in this order.
+            is_run_input: Whether to track this collection as run input.
+
+        Examples:
+            >>> collection = ln.Collection.get(name="my collection")
+            >>> mapped = ln.core.MappedCollection.from_collection(
+            ...     collection, obs_keys="cell_type", shard=(rank, world_size)
+            ... )
+        """
+        from lamindb._collection import _mapped
+
+        return _mapped(
+            collection,
+            layers_keys=layers_keys,
+            obs_keys=obs_keys,
+            obsm_keys=obsm_keys,
+            obs_filter=obs_filter,
+            join=join,
+            encode_labels=encode_labels,
+            unknown_label=unknown_label,
+            cache_categories=cache_categories,
+            parallel=parallel,
+            dtype=dtype,
+            stream=stream,
+            cache_meta=cache_meta,
+            save_meta=save_meta,
+            max_workers=max_workers,
+            output=output,
+            shard=shard,
+            preload=preload,
+            var_subset=var_subset,
+            is_run_input=is_run_input,
+        )
+
+    def get_meta(self) -> pd.DataFrame:
+        """Get metadata of the `AnnData` objects.
+
+        Returns a dataframe with a row for each object in ``path_list``.
+        The columns hold the number of observations, the indices of the observations
+        selected by ``obs_filter``, the variables with their hashes, the categories
+        of ``obs_keys`` and the codes of the labels into their merged categories.
+        Variables are only stored in the first row with the same hash,
+        the merged categories only in the first row.
+
+        Pass it to ``meta`` to construct a `MappedCollection` without reading
+        the metadata from the objects.
+        """
+        if self.var_list is None:
+            self._read_vars()
+        meta: dict[str, list] = {"n_obs": [], "indices": [], "var_hash": [], "var": []}
+        if self.obs_keys is not None:
+            for label in self.obs_keys:
+                meta[f"categories_{label}"] = []
+                codes = self._get_label_codes(label)
+                meta[f"label_categories_{label}"] = [self._label_cats[label]]
+                meta[f"label_categories_{label}"] += [None] * (len(self.storages) - 1)
+                meta[f"label_codes_{label}"] = np.split(
+                    codes, np.cumsum(self.n_obs_list)[:-1]
+                )
+        var_hashes = set()
+        for i, storage in enumerate(self.storages):
+            with _Connect(storage) as store:
+                X = store["X"]
+                if isinstance(X, ArrayTypes):  # type: ignore
+                    meta["n_obs"].append(X.shape[0])
+                else:
+                    meta["n_obs"].append(X.attrs["shape"][0])
+                if self.obs_keys is not None:
+                    for label in self.obs_keys:
+                        if label in self._cache_cats:
+                            cats = self._cache_cats[label][i]
+                        else:
+                            cats = self._get_categories(store, label)
+                            if cats is not None:
+                                cats = (
+                                    _decode(cats)
+                                    if isinstance(cats[0], bytes)
+                                    else cats[...]
+                                )
+                        meta[f"categories_{label}"].append(cats)
+            meta["indices"].append(self.indices_list[i] if self.filtered else None)
+            vrs = self.var_list[i]  # type: ignore
+            var_hash = hash_and_encode_as_b62("\n".join(vrs.astype(str)))
+            meta["var_hash"].append(var_hash)
+            meta["var"].append(None if var_hash in var_hashes else vrs.values)
+            var_hashes.add(var_hash)
+        return pd.DataFrame(meta)
+
+    def _set_meta(self, meta: pd.DataFrame):
+        if len(meta) != len(self.storages):
+            raise ValueError("`meta` should have a row for each object in `path_list`.")
+        if self.filtered and meta["indices"].isna().any():
+            raise ValueError("`meta` was created without `obs_filter`.")
+        self.n_obs_list, self.indices_list = [], []
+        for n_obs, indices in zip(meta["n_obs"], meta["indices"]):
+            if self.filtered:
+                indices = np.asarray(indices, dtype=np.int64)
+            else:
+                indices = np.arange(n_obs)
+            self.n_obs_list.append(len(indices))
+            self.indices_list.append(indices)
+        # the same variables are stored only once
+        vars_by_hash = {}
+        for var_hash, vrs in zip(meta["var_hash"], meta["var"]):
+            if vrs is not None and var_hash not in vars_by_hash:
+                vars_by_hash[var_hash] = pd.Index(vrs)
+        self.var_list = [vars_by_hash[var_hash] for var_hash in meta["var_hash"]]
+        self.n_vars_list = [len(vrs) for vrs in self.var_list]
+        if self.obs_keys is not None:
+            for label in self.obs_keys:
+                column = f"categories_{label}"
+                if column not in meta.columns:
+                    raise ValueError(f"`meta` doesn't have categories for {label}.")
+                self._cache_cats[label] = [
+                    None if cats is None else np.asarray(cats) for cats in meta[column]
+                ]
+                # metadata written before the labels were stored has only categories
+                if f"label_codes_{label}" in meta.columns:
+                    cats = meta[f"label_categories_{label}"].iloc[0]
+                    self._label_cats[label] = np.asarray(cats)
+                    self._label_codes[label] = np.concatenate(
+                        [
+                            np.asarray(codes, dtype=np.int32)
+                            for codes in meta[f"label_codes_{label}"]
+                        ]
+                    )
+
     def _cache_categories(self, obs_keys: list):
-        self._cache_cats = {}
-        for label in obs_keys:
-            self._cache_cats[label] = []
-            for storage in self.storages:
-                with _Connect(storage) as store:
+        def read_categories(storage):
+            cats_storage = []
+            with _Connect(storage) as store:
+                for label in obs_keys:
                     cats = self._get_categories(store, label)
                     if cats is not None:
                         cats = (
                             _decode(cats) if isinstance(cats[0], bytes) else cats[...]
                         )
-                    self._cache_cats[label].append(cats)
+                    cats_storage.append(cats)
+            return cats_storage
+
+        cats_list = _map_ordered(read_categories, self.storages, self._max_workers)
+        self._cache_cats = {
+            label: [cats_storage[i] for cats_storage in cats_list]
+            for i, label in enumerate(obs_keys)
+        }
+
+    def _read_label_codes(self, store: StorageType, label_key: str, storage_idx: int):
+        """Read the categories and the codes of the labels in a store."""
+        codes = self._get_codes(store, label_key)
+        if label_key in self._cache_cats:
+            cats = self._cache_cats[label_key][storage_idx]
+        else:
+            cats = self._get_categories(store, label_key)
+        if cats is not None:
+            cats = _decode(cats) if isinstance(cats[0], bytes) else cats[...]
+        else:
+            is_bytes = len(codes) > 0 and isinstance(codes[0], bytes)
+            cats, codes = np.unique(
+                _decode(codes) if is_bytes else codes, return_inverse=True
+            )
+        return np.asarray(cats), codes
+
+    def _make_label_codes(self, obs_keys: list):
+        if len(obs_keys) == 0:
+            return None
+
+        def read_codes(storage_idx):
+            with _Connect(self.storages[storage_idx]) as store:
+                return [
+                    self._read_label_codes(store, label, storage_idx)
+                    for label in obs_keys
+                ]
+
+        codes_list = _map_ordered(
+            read_codes, range(len(self.storages)), self._max_workers
+        )
+        for i, label in enumerate(obs_keys):
+            cats_merge = set()
+            for codes_storage in codes_list:
+                cats_merge.update(codes_storage[i][0].tolist())
+            cats_merge = np.asarray(sorted(cats_merge))
+            codes_merge = []
+            for storage_idx, codes_storage in enumerate(codes_list):
+                cats, codes = codes_storage[i]
+                # map the codes of the store to the codes of the merged categories
+                cats_map = np.searchsorted(cats_merge, cats).astype(np.int32)
+                codes_merge.append(cats_map[codes[self.indices_list[storage_idx]]])
+            self._label_cats[label] = cats_merge
+            self._label_codes[label] = np.concatenate(codes_merge)
+
+    def _get_label_codes(self, label: str) -> np.ndarray:
+        """Codes of a label of ``obs_keys`` into its merged categories, read on first use."""
+        if label not in self._label_codes:
+            self._make_label_codes([label])
+        return self._label_codes[label]
+
+    def _get_label_cats(self, label: str) -> np.ndarray:
+        """Merged categories of a label of ``obs_keys``, without reading the codes."""
+        if label not in self._label_cats:
+            self._label_cats[label] = np.asarray(self.get_merged_categories(label))
+        return self._label_cats[label]
 
     def _make_encoders(self, encode_labels: list):
         for label in encode_labels:
-            cats = self.get_merged_categories(label)
+            cats = self._get_label_cats(label).tolist()
             encoder = {}
             if isinstance(self.unknown_label, dict):
                 unknown_label = self.unknown_label.get(label, None)
@@ -270,15 +983,17 @@ class MappedCollection:
                 encoder[unknown_label] = -1
             encoder.update({cat: i for i, cat in enumerate(cats)})
             self.encoders[label] = encoder
+            self._encoded_codes[label] = np.array(
+                [encoder[cat] for cat in self._get_label_cats(label).tolist()]
+            )
 
     def _read_vars(self):
-        self.var_list = []
-        self.n_vars_list = []
-        for storage in self.storages:
+        def read_vars(storage):
             with _Connect(storage) as store:
-                vars = _safer_read_index(store["var"])
-                self.var_list.append(vars)
-                self.n_vars_list.append(len(vars))
+                return _safer_read_index(store["var"])
+
+        self.var_list = _map_ordered(read_vars, self.storages, self._max_workers)
+        self.n_vars_list = [len(vrs) for vrs in self.var_list]
 
     def _make_join_vars(self):
         if self.var_list is None:
@@ -305,6 +1020,30 @@ class MappedCollection:
                 self.var_joint.get_indexer(vrs) for vrs in self.var_list
             ]
 
+    def _make_var_subset(self, var_subset: pd.Index | list[str]):
+        if self.var_list is None:
+            self._read_vars()
+        var_subset = pd.Index(var_subset)
+        if not var_subset.is_unique:
+            raise ValueError("`var_subset` should not contain duplicated variables.")
+        if self.join_vars == "inner":
+            var_subset = var_subset[
+                var_subset.isin(reduce(pd.Index.intersection, self.var_list))
+            ]
+            if len(var_subset) == 0:
+                raise ValueError(
+                    "The provided AnnData objects don't have shared variables"
+                    " from `var_subset`."
+                )
+        self.var_joint = var_subset
+        self.n_vars = len(var_subset)
+        self._var_selects = []
+        for vrs in self.var_list:
+            # old to new positions, -1 for the variables which are not selected
+            var_map = var_subset.get_indexer(vrs)
+            cols_old = np.flatnonzero(var_map >= 0)
+            self._var_selects.append((cols_old, var_map[cols_old], var_map))
+
     def check_vars_sorted(self, ascending: bool = True) -> bool:
         """Returns `True` if all variables are sorted in all objects."""
         if self.var_list is None:
@@ -326,18 +1065,6 @@ class MappedCollection:
         vars = pd.Index(vars)
         return [i for i, vrs in enumerate(self.var_list) if not vrs.equals(vars)]
 
-    def _check_csc_raise_error(
-        self, elem: GroupType | ArrayType, key: str, path: UPathStr
-    ):
-        if isinstance(elem, ArrayTypes):  # type: ignore
-            return
-        if get_spec(elem).encoding_type == "csc_matrix":
-            if not self.parallel:
-                self.close()
-            raise ValueError(
-                f"{key} in {path} is a csc matrix, `MappedCollection` doesn't support this format yet."
-            )
-
     def __len__(self):
         return self.n_obs
 
@@ -363,32 +1090,36 @@ class MappedCollection:
         else:
             var_idxs_join = None
 
-        with _Connect(self.storages[storage_idx]) as store:
+        with self._connect(storage_idx) as store:
             out = {}
             for layers_key in self.layers_keys:
-                lazy_data = (
-                    store["X"] if layers_key == "X" else store["layers"][layers_key]
-                )
-                out[layers_key] = self._get_data_idx(
-                    lazy_data, obs_idx, self.join_vars, var_idxs_join, self.n_vars
-                )
+                lazy_data = self._get_lazy_data(store, storage_idx, layers_key)
+                if self._output == "csr" or self._var_selects is not None:
+                    value = self._get_data_idxs(
+                        lazy_data,
+                        np.array([obs_idx]),
+                        self.join_vars,
+                        var_idxs_join,
+                        self.n_vars,
+                        sparse=self._output == "csr",
+                        var_select=self._get_var_select(storage_idx),
+                    )
+                    out[layers_key] = value if self._output == "csr" else value[0]
+                else:
+                    out[layers_key] = self._get_data_idx(
+                        lazy_data, obs_idx, self.join_vars, var_idxs_join, self.n_vars
+                    )
             if self.obsm_keys is not None:
                 for obsm_key in self.obsm_keys:
-                    lazy_data = store["obsm"][obsm_key]
+                    lazy_data = self._get_lazy_data(
+                        store, storage_idx, obsm_key, "obsm"
+                    )
                     out[f"obsm_{obsm_key}"] = self._get_data_idx(lazy_data, obs_idx)
             out["_store_idx"] = storage_idx
-            if self.obs_keys is not None:
-                for label in self.obs_keys:
-                    if label in self._cache_cats:
-                        cats = self._cache_cats[label][storage_idx]
-                        if cats is None:
-                            cats = []
-                    else:
-                        cats = None
-                    label_idx = self._get_obs_idx(store, obs_idx, label, cats)
-                    if label in self.encoders:
-                        label_idx = self.encoders[label][label_idx]
-                    out[label] = label_idx
+        if self.obs_keys is not None:
+            for label in self.obs_keys:
+                codes = self._get_label_codes(label)
+                out[label] = self._decode_labels(label, codes[idx])
         return out
 
     def _get_data_idx(
@@ -400,7 +1131,11 @@ class MappedCollection:
         n_vars_out: int | None = None,
     ):
         """Get the index for the data."""
-        if isinstance(lazy_data, ArrayTypes):  # type: ignore
+        if isinstance(lazy_data, _CSCRows):
+            return self._get_data_idxs(
+                lazy_data, np.array([idx]), join_vars, var_idxs_join, n_vars_out
+            )[0]
+        if isinstance(lazy_data, _DenseTypes):
             lazy_data_idx = lazy_data[idx]  # type: ignore
             if join_vars is None:
                 result = lazy_data_idx
@@ -432,33 +1167,192 @@ class MappedCollection:
                     lazy_data_idx = lazy_data_idx[var_idxs_join]
             return lazy_data_idx
 
-    def _get_obs_idx(
+    def __getitems__(self, idxs: list[int]) -> list[dict]:
+        batch = self._get_batch(idxs)
+        return [
+            {key: value[i] for key, value in batch.items()} for i in range(len(idxs))
+        ]
+
+    def _get_batch(self, idxs: list[int] | np.ndarray) -> dict[str, np.ndarray]:
+        """Get the observations for the indices as arrays with the first axis for the batch."""
+        idxs = np.asarray(idxs)
+        obs_idxs = self.indices[idxs]
+        storage_idxs = self.storage_idx[idxs]
+
+        out: dict[str, list] = {}
+        for storage_idx in np.unique(storage_idxs):
+            batch_pos = np.flatnonzero(storage_idxs == storage_idx)
+            obs_idx = obs_idxs[batch_pos]
+            if self.var_indices is not None:
+                var_idxs_join = self.var_indices[storage_idx]
+            else:
+                var_idxs_join = None
+
+            with self._connect(storage_idx) as store:
+                values = {}
+                for layers_key in self.layers_keys:
+                    lazy_data = self._get_lazy_data(store, storage_idx, layers_key)
+                    values[layers_key] = self._get_data_idxs(
+                        lazy_data,
+                        obs_idx,
+                        self.join_vars,
+                        var_idxs_join,
+                        self.n_vars,
+                        sparse=self._output == "csr",
+                        var_select=self._get_var_select(storage_idx),
+                    )
+                if self.obsm_keys is not None:
+                    for obsm_key in self.obsm_keys:
+                        lazy_data = self._get_lazy_data(
+                            store, storage_idx, obsm_key, "obsm"
+                        )
+                        values[f"obsm_{obsm_key}"] = self._get_data_idxs(
+                            lazy_data, obs_idx
+                        )
+                values["_store_idx"] = np.full(len(obs_idx), storage_idx)
+            for key, value in values.items():
+                out.setdefault(key, []).append((batch_pos, value))
+        if self.obs_keys is not None:
+            for label in self.obs_keys:
+                codes = self._get_label_codes(label)
+                labels = self._decode_labels(label, codes[idxs])
+                out[label] = [(np.arange(len(idxs)), labels)]
+
+        # scatter the values from all storages into preallocated batch arrays
+        batch = {}
+        for key, parts in out.items():
+            first = parts[0][1]
+            if issparse(first):
+                # stack the rows of all storages and bring them into the batch order
+                stacked = sparse_vstack([value for _, value in parts], format="csr")
+                order = np.empty(len(idxs), dtype=np.int64)
+                order[np.concatenate([batch_pos for batch_pos, _ in parts])] = (
+                    np.arange(len(idxs))
+                )
+                batch[key] = stacked[order]
+                continue
+            dtype = np.result_type(*(value for _, value in parts))
+            result = np.empty((len(idxs), *first.shape[1:]), dtype=dtype)
+            for batch_pos, value in parts:
+                result[batch_pos] = value
+            batch[key] = result
+        return batch
+
+    def _get_var_select(self, storage_idx: int):
+        if self._var_selects is None:
+            return None
+        return self._var_selects[storage_idx]
+
+    def _get_data_idxs(
         self,
-        storage: StorageType,
-        idx: int,
-        label_key: str,
-        categories: list | None = None,
+        lazy_data: ArrayType | GroupType,
+        idxs: np.ndarray,
+        join_vars: Literal["inner", "outer"] | None = None,
+        var_idxs_join: list | None = None,
+        n_vars_out: int | None = None,
+        sparse: bool = False,
+        var_select: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None,
     ):
-        """Get the index for the label by key."""
-        obs = storage["obs"]  # type: ignore
-        # how backwards compatible do we want to be here actually?
-        if isinstance(obs, ArrayTypes):  # type: ignore
-            label = obs[idx][obs.dtype.names.index(label_key)]
-        else:
-            labels = obs[label_key]
-            if isinstance(labels, ArrayTypes):  # type: ignore
-                label = labels[idx]
+        """Get the data for several indices with bulk reads.
+
+        Returns a `csr_matrix` if `sparse` is `True`.
+        If `var_select` is passed, returns only the selected variables.
+        """
+        if isinstance(lazy_data, _CSCRows):
+            idxs_uniq, idxs_inverse = np.unique(idxs, return_inverse=True)
+            lazy_data, idxs = lazy_data.to_csr_group(idxs_uniq), idxs_inverse
+        if var_select is not None and isinstance(lazy_data, _DenseTypes):
+            cols_old, cols_new, _ = var_select
+            if len(cols_old) == 0:
+                data = np.zeros((len(idxs), 0), dtype=lazy_data.dtype)
+            elif isinstance(lazy_data, np.ndarray):
+                data = lazy_data[np.ix_(idxs, cols_old)]
             else:
-                label = labels["codes"][idx]
-        if categories is not None:
-            cats = categories
-        else:
-            cats = self._get_categories(storage, label_key)
-        if cats is not None and len(cats) > 0:
-            label = cats[label]
-        if isinstance(label, bytes):
-            label = label.decode("utf-8")
-        return label
+                idxs_uniq, idxs_inverse = np.unique(idxs, return_inverse=True)
+                data, offsets = _read_spans(
+                    lazy_data, idxs_uniq, idxs_uniq + 1, cols=cols_old
+                )
+                data = data[offsets[idxs_inverse]]
+            dtype = data.dtype if self._dtype is None else self._dtype
+            result = np.zeros((len(idxs), n_vars_out), dtype=dtype)
+            result[:, cols_new] = data
+            return csr_matrix(result) if sparse else result
+        if isinstance(lazy_data, _DenseTypes):
+            if isinstance(lazy_data, np.ndarray):
+                lazy_data_idxs = lazy_data[idxs]
+            else:
+                idxs_uniq, idxs_inverse = np.unique(idxs, return_inverse=True)
+                data, offsets = _read_spans(lazy_data, idxs_uniq, idxs_uniq + 1)
+                lazy_data_idxs = data[offsets[idxs_inverse]]
+            if join_vars == "outer":
+                dtype = lazy_data_idxs.dtype if self._dtype is None else self._dtype
+                result = np.zeros((len(idxs), n_vars_out), dtype=dtype)
+                result[:, var_idxs_join] = lazy_data_idxs
+            else:
+                if join_vars == "inner":
+                    result = lazy_data_idxs[:, var_idxs_join]
+                else:
+                    result = lazy_data_idxs
+                if self._dtype is not None:
+                    result = result.astype(self._dtype, copy=False)
+            return csr_matrix(result) if sparse else result
+        else:  # assume csr_matrix here
+            idxs_uniq, idxs_inverse = np.unique(idxs, return_inverse=True)
+            # read the indptr pairs of the rows with coalesced requests
+            indptr, offsets = _read_spans(lazy_data["indptr"], idxs_uniq, idxs_uniq + 2)  # type: ignore
+            starts, ends = indptr[offsets], indptr[offsets + 1]
+            if isinstance(lazy_data, _PreloadedGroup):
+                data, indices, offsets = lazy_data["data"], lazy_data["indices"], starts
+            else:
+                # read data and indices for all the rows with coalesced requests
+                data, offsets = _read_spans(lazy_data["data"], starts, ends)  # type: ignore
+                indices, _ = _read_spans(lazy_data["indices"], starts, ends)  # type: ignore
+            # gather the entries of the rows in the order of idxs
+            lengths = (ends - starts)[idxs_inverse]
+            offsets = offsets[idxs_inverse]
+            cum_lengths = np.cumsum(lengths)
+            gather = np.arange(cum_lengths[-1] if len(cum_lengths) > 0 else 0)
+            gather += np.repeat(offsets - cum_lengths + lengths, lengths)
+            rows = np.repeat(np.arange(len(idxs)), lengths)
+            data_s, cols = data[gather], indices[gather]
+            dtype = data_s.dtype if self._dtype is None else self._dtype
+            if var_select is not None:
+                n_cols = n_vars_out
+                cols = var_select[2][cols]
+                keep = cols >= 0
+                rows, cols, data_s = rows[keep], cols[keep], data_s[keep]
+            elif join_vars == "outer":
+                n_cols = n_vars_out
+                cols = var_idxs_join[cols]
+            elif join_vars == "inner":
+                n_cols = len(var_idxs_join)
+                var_map = np.full(lazy_data.attrs["shape"][1], -1)  # type: ignore
+                var_map[var_idxs_join] = np.arange(n_cols)
+                cols = var_map[cols]
+                keep = cols >= 0
+                rows, cols, data_s = rows[keep], cols[keep], data_s[keep]
+            else:
+                n_cols = lazy_data.attrs["shape"][1]  # type: ignore
+            if sparse:
+                # rows are already in order, only need the number of entries per row
+                result_indptr = np.zeros(len(idxs) + 1, dtype=np.int64)
+                np.cumsum(np.bincount(rows, minlength=len(idxs)), out=result_indptr[1:])
+                result = csr_matrix(
+                    (data_s.astype(dtype, copy=False), cols, result_indptr),
+                    shape=(len(idxs), n_cols),
+                )
+                # the joins can change the order of the variables
+                result.sort_indices()
+                return result
+            result = np.zeros((len(idxs), n_cols), dtype=dtype)
+            result[rows, cols] = data_s
+            return result
+
+    def _decode_labels(self, label_key: str, codes: np.ndarray | int):
+        """Get the labels or the encoded labels from the codes."""
+        if label_key in self.encoders:
+            return self._encoded_codes[label_key][codes]
+        return self._label_cats[label_key][codes]
 
     def get_label_weights(
         self,
@@ -483,29 +1377,54 @@ class MappedCollection:
         """
         if isinstance(obs_keys, str):
             obs_keys = [obs_keys]
-        labels_list = []
+        # combine the codes of the keys with mixed-radix arithmetic
+        codes = np.zeros(self.n_obs, dtype=np.int64)
+        n_codes = 1
+        # categories of the keys and the observed combined codes if renumbered
+        radices = []
         for label_key in obs_keys:
-            labels_to_str = self.get_merged_labels(label_key).astype(str).astype("O")
-            labels_list.append(labels_to_str)
-        if len(labels_list) > 1:
-            labels = ["__".join(labels_obs) for labels_obs in zip(*labels_list)]
-        else:
-            labels = labels_list[0]
-        counter = Counter(labels)
-        if return_categories:
-            return {
-                k: 1.0 / v if scaler is None else scaler / (v + scaler)
-                for k, v in counter.items()
-            }
-        counts = np.array([counter[label] for label in labels])
+            if self.obs_keys is not None and label_key in self.obs_keys:
+                codes_key = self._get_label_codes(label_key)
+                cats = self._label_cats[label_key]
+            else:
+                cats, codes_key = np.unique(
+                    self.get_merged_labels(label_key), return_inverse=True
+                )
+            codes = codes * len(cats) + codes_key
+            n_codes *= len(cats)
+            observed = None
+            if n_codes > max(self.n_obs, 1):
+                # renumber the observed combinations to keep the counts small
+                observed, codes = np.unique(codes, return_inverse=True)
+                n_codes = len(observed)
+            radices.append((cats, observed))
+        counts = np.bincount(codes, minlength=n_codes)
         if scaler is None:
-            weights = 1.0 / counts
+            weights_codes = 1.0 / np.maximum(counts, 1)
         else:
-            weights = scaler / (counts + scaler)
-        return weights
+            weights_codes = scaler / (counts + scaler)
+        if not return_categories:
+            return weights_codes[codes]
+
+        def decode(code):
+            labels = []
+            for cats, observed in reversed(radices):
+                if observed is not None:
+                    code = observed[code]
+                code, cat_idx = divmod(code, len(cats))
+                labels.append(str(cats[cat_idx]))
+            return "__".join(reversed(labels))
+
+        return {
+            decode(code): weights_codes[code]
+            for code in np.flatnonzero(counts).tolist()
+        }
 
     def get_merged_labels(self, label_key: str):
         """Get merged labels for `label_key` from all `.obs`."""
+        if self.obs_keys is not None and label_key in self.obs_keys:
+            codes = self._get_label_codes(label_key)
+            return self._label_cats[label_key][codes]
         labels_merge = []
         for i, storage in enumerate(self.storages):
             with _Connect(storage) as store:
@@ -517,6 +1436,8 @@ class MappedCollection:
 
     def get_merged_categories(self, label_key: str):
         """Get merged categories for `label_key` from all `.obs`."""
+        if label_key in self._label_cats:
+            return self._label_cats[label_key].tolist()
         cats_merge = set()
         for i, storage in enumerate(self.storages):
             with _Connect(storage) as store:
@@ -566,7 +1487,7 @@ class MappedCollection:
         """Get codes."""
         obs = storage["obs"]  # type: ignore
         if isinstance(obs, ArrayTypes):  # type: ignore
-            label = obs[label_key]
+            return obs[label_key]
         else:
             label = obs[label_key]
             if isinstance(label, ArrayTypes):  # type: ignore
@@ -592,8 +1513,10 @@ class MappedCollection:
     def close(self):
         """Close connections to array streaming backend.
 
-        No effect if `parallel=True`.
+        Connections are not affected if `parallel=True`,
+        but the shared memory is released.
         """
+        self._unshare_arrays()
         for storage in self.storages:
             if hasattr(storage, "close"):
                 storage.close()
@@ -616,6 +1539,24 @@ class MappedCollection:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
+    @staticmethod
+    def collate_csr(batch: list[dict]) -> dict:
+        """`collate_fn` for `torch.utils.data.DataLoader` with ``output="csr"``.
+
+        Stacks the sparse rows into one `scipy.sparse.csr_matrix` and
+        the other values into numpy arrays.
+        The sparse batch can be converted to a `torch.sparse_csr_tensor` via its
+        ``indptr``, ``indices``, ``data`` and ``shape`` attributes.
+        """
+        collated = {}
+        for key in batch[0]:
+            values = [sample[key] for sample in batch]
+            if issparse(values[0]):
+                collated[key] = sparse_vstack(values, format="csr")
+            else:
+                collated[key] = np.stack(values)
+        return collated
+
     @staticmethod
     def torch_worker_init_fn(worker_id):
         """`worker_init_fn` for `torch.utils.data.DataLoader`.
@@ -625,7 +1566,11 @@ class MappedCollection:
         from torch.utils.data import get_worker_info
 
         mapped = get_worker_info().dataset
-        mapped.parallel = False
-        mapped.storages = []
-        mapped.conns = []
-        mapped._make_connections(mapped.path_list, parallel=False)
+        mapped._reconnect()
+
+    def _reconnect(self):
+        """Open new connections in a worker process."""
+        self.parallel = False
+        self.storages = []
+        self.conns = []
+        self._make_connections(self.path_list, parallel=False)
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from ._mapped_collection import MappedCollection
+
+
+class BlockShuffleSampler:
+    """Sampler that shuffles contiguous blocks of observations of a `MappedCollection`.
+
+    The observations of each `AnnData` object are split into blocks of consecutive
+    observations, the order of the blocks is shuffled and then the indices are shuffled
+    within a buffer of ``buffer_size`` indices. This gives a close-to-random order
+    of samples while reading the underlying arrays close-to-sequentially.
+
+    Blocks never span several `AnnData` objects and respect `obs_filter`,
+    a block contains only the selected observations.
+
+    The order is generated lazily window by window from seeds derived from ``seed``,
+    the epoch, the block and the window, so the full permutation is never materialized.
+    The position within an epoch can be saved with :meth:`state_dict` and
+    restored with :meth:`load_state_dict`, iteration then starts directly
+    at the next index of the epoch.
+
+    Use it with `torch.utils.data.DataLoader` via the `sampler` argument.
+
+    Args:
+        mapped: A `MappedCollection` object to sample from.
+        block_size: The number of consecutive observations in a block.
+            For chunked dense arrays it is rounded up to a multiple of the chunk size
+            along the observations axis.
+        buffer_size: The number of indices to shuffle together after shuffling the blocks.
+            Defaults to ``4 * block_size``, no shuffling within blocks if ``1``.
+        weights: Weights for all observations, for example from
+            :meth:`~lamindb.core.MappedCollection.get_label_weights`.
+            If passed, ``num_samples`` observations are drawn with replacement
+            according to the weights and then ordered by shuffled blocks.
+        num_samples: The number of observations to draw if ``weights`` are passed.
+            Defaults to the length of ``mapped``.
+        seed: The seed for the random number generator.
+
+    Examples:
+        >>> from torch.utils.data import DataLoader
+        >>> mapped = collection.mapped(obs_keys="cell_type")
+        >>> sampler = ln.core.BlockShuffleSampler(mapped, block_size=1024)
+        >>> dl = DataLoader(mapped, batch_size=128, sampler=sampler)
+
+        Resume in the middle of an epoch from a checkpoint after ``n_batches`` batches:
+
+        >>> state = sampler.state_dict(num_consumed=n_batches * 128)
+        >>> sampler.load_state_dict(state)
+    """
+
+    def __init__(
+        self,
+        mapped: MappedCollection,
+        block_size: int = 1024,
+        buffer_size: int | None = None,
+        weights: np.ndarray | None = None,
+        num_samples: int | None = None,
+        seed: int = 0,
+    ):
+        if block_size < 1:
+            raise ValueError("`block_size` should be a positive integer.")
+        if weights is not None and len(weights) != len(mapped):
+            raise ValueError("`weights` should have the same length as `mapped`.")
+
+        block_sizes = np.empty(len(mapped.storages), dtype=np.int64)
+        for storage_idx in range(len(mapped.storages)):
+            chunk_rows = mapped._get_chunk_rows(storage_idx)
+            if chunk_rows is not None:
+                block_sizes[storage_idx] = -(-block_size // chunk_rows) * chunk_rows
+            else:
+                block_sizes[storage_idx] = block_size
+        # a new block starts where the storage or the block of the observation changes
+        blocks = mapped.indices // block_sizes[mapped.storage_idx]
+        new_block = (np.diff(blocks) != 0) | (np.diff(mapped.storage_idx) != 0)
+        self.block_starts = np.concatenate(([0], np.flatnonzero(new_block) + 1))
+        self.block_ends = np.append(self.block_starts[1:], len(mapped))
+
+        self.block_size = block_size
+        self.buffer_size = 4 * block_size if buffer_size is None else buffer_size
+        self._block_weights = None
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            weights = weights / weights.sum()
+            block_weights = np.add.reduceat(weights, self.block_starts)
+            self._block_weights = block_weights / block_weights.sum()
+        self.weights = weights
+        self.num_samples = len(mapped) if num_samples is None else num_samples
+        self.seed = seed
+        self.epoch = 0
+        # the epoch which is iterated and the number of indices yielded in it
+        self._state_epoch = self.epoch
+        self._state_position = 0
+        self._start_position = 0
+        self._block_cache: tuple | None = None
+
+    def set_epoch(self, epoch: int):
+        """Set the epoch to get a different order of samples for each epoch."""
+        if epoch != self.epoch:
+            self._start_position = 0
+        self.epoch = epoch
+        self._state_epoch = epoch
+
+    def state_dict(self, num_consumed: int | None = None) -> dict:
+        """The seed, the epoch and the number of indices yielded in this epoch.
+
+        A `DataLoader` with workers takes indices from the sampler ahead of the
+        batches it returns, the prefetched indices are counted as yielded.
+        Pass ``num_consumed`` to save the position after the samples which
+        were actually consumed instead.
+
+        Args:
+            num_consumed: The number of samples consumed in this epoch,
+                including the ones before a resumed position,
+                for example the number of batches times the batch size.
+        """
+        position = self._state_position
+        if num_consumed is not None:
+            if not 0 <= num_consumed <= position:
+                raise ValueError(
+                    f"`num_consumed` should be between 0 and {position},"
+                    " the number of indices yielded in this epoch."
+                )
+            position = num_consumed
+        return {"seed": self.seed, "epoch": self._state_epoch, "position": position}
+
+    def load_state_dict(self, state_dict: dict):
+        """Continue the iteration from a state returned by :meth:`state_dict`."""
+        if not 0 <= state_dict["position"] <= len(self):
+            raise ValueError("The position in `state_dict` is out of range.")
+        self.seed = state_dict["seed"]
+        self.epoch = self._state_epoch = state_dict["epoch"]
+        self._start_position = self._state_position = state_dict["position"]
+
+    def __len__(self):
+        return (
+            self.num_samples if self.weights is not None else int(self.block_ends[-1])
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        epoch, start = self.epoch, self._start_position
+        self.epoch += 1
+        self._start_position = 0
+        self._state_epoch, self._state_position = epoch, start
+
+        rng = np.random.default_rng((self.seed, epoch))
+        block_perm = rng.permutation(len(self.block_starts))
+        if self._block_weights is None:
+            lengths = self.block_ends - self.block_starts
+        else:
+            # the number of draws from each block, the draws are made per block
+            lengths = rng.multinomial(self.num_samples, self._block_weights)
+        lengths = lengths[block_perm]
+        cum_lengths = np.cumsum(lengths)
+        total = int(cum_lengths[-1]) if len(cum_lengths) > 0 else 0
+
+        shuffle = self.buffer_size > 1
+        window = self.buffer_size if shuffle else self.block_size
+        for window_start in range(start - start % window, total, window):
+            window_end = min(window_start + window, total)
+            indices = self._window_indices(
+                epoch, block_perm, lengths, cum_lengths, window_start, window_end
+            )
+            if shuffle:
+                window_rng = np.random.default_rng(
+                    (self.seed, epoch, 1, window_start // window)
+                )
+                window_rng.shuffle(indices)
+            for idx in indices[max(start - window_start, 0) :].tolist():
+                self._state_position += 1
+                yield idx
+        self._state_epoch, self._state_position = epoch + 1, 0
+
+    def _window_indices(
+        self,
+        epoch: int,
+        block_perm: np.ndarray,
+        lengths: np.ndarray,
+        cum_lengths: np.ndarray,
+        window_start: int,
+        window_end: int,
+    ) -> np.ndarray:
+        """Indices at the positions `[window_start, window_end)` of the epoch."""
+        first = np.searchsorted(cum_lengths, window_start, side="right")
+        last = np.searchsorted(cum_lengths, window_end - 1, side="right")
+        parts = []
+        for rank in range(first, last + 1):
+            # blocks without draws, their weights can sum to zero
+            if lengths[rank] == 0:
+                continue
+            block_begin = cum_lengths[rank] - lengths[rank]
+            block_indices = self._block_indices(epoch, block_perm[rank], lengths[rank])
+            parts.append(
+                block_indices[
+                    max(window_start - block_begin, 0) : window_end - block_begin
+                ]
+            )
+        return np.concatenate(parts)
+
+    def _block_indices(self, epoch: int, block: int, length: int) -> np.ndarray:
+        """Indices of a block, drawn with a seed of the block if weighted."""
+        cache_key = (self.seed, epoch, block)
+        if self._block_cache is not None and self._block_cache[0] == cache_key:
+            return self._block_cache[1]
+        start, end = self.block_starts[block], self.block_ends[block]
+        if self.weights is None:
+            indices = np.arange(start, end)
+        else:
+            rng = np.random.default_rng((self.seed, epoch, 0, block))
+            weights = self.weights[start:end]
+            indices = rng.choice(
+                np.arange(start, end), size=length, p=weights / weights.sum()
+            )
+            indices.sort()
+        self._block_cache = (cache_key, indices)
+        return indices
@@ -9,6 +9,10 @@ from lamindb_setup._set_managed_storage import set_managed_storage
 from lamindb_setup.core._settings import settings as setup_settings
 from lamindb_setup.core._settings_instance import sanitize_git_repo_url
 
+from .subsettings._block_cache_settings import (
+    BlockCacheSettings,
+    block_cache_settings,
+)
 from .subsettings._creation_settings import CreationSettings, creation_settings
 from .subsettings._transform_settings import TransformSettings, transform_settings
 
@@ -52,6 +56,15 @@ class Settings:
         """
         return creation_settings
 
+    @property
+    def block_cache(self) -> BlockCacheSettings:
+        """Block cache settings for reading remote `.h5ad` and `.h5` files.
+
+        For example, `ln.settings.block_cache.persist = True` will also keep
+        the blocks in the cache directory across sessions.
+        """
+        return block_cache_settings
+
     track_run_inputs: bool = True
     """Track files as input upon `.load()`, `.cache()` and `.open()`.
 
@@ -59,6 +72,14 @@ class Settings:
 
     FAQ: :doc:`/faq/track-run-inputs`
     """
+    pool_handles: bool = False
+    """Share the open handles of `.h5ad`, `.h5` and `.zarr` artifacts (default `False`).
+
+    If `True`, :meth:`~lamindb.Artifact.open` with `mode="r"` returns a reference
+    to a handle shared by all calls for the same version of the artifact.
+    Closing the reference keeps the file open for later calls, the least recently
+    used of the unused files are closed.
+    """
     __using_key: str | None = None
     _using_storage: str | None = None
 
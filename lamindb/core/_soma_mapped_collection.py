@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+import pandas as pd
+from lamindb_setup.core.upath import create_path
+from scipy.sparse import csr_matrix
+
+from ._mapped_collection import (
+    MappedCollection,
+    _map_ordered,
+    _PreloadedGroup,
+    _select_values,
+)
+from .storage._anndata_accessor import _coalesce_spans
+from .storage._tiledbsoma import _open_tiledbsoma
+
+if TYPE_CHECKING:
+    from lamindb_setup.core.types import UPathStr
+    from tiledbsoma import DenseNDArray, Experiment, SparseNDArray
+
+# joinids separated by fewer joinids than this are read with one range query,
+# fewer than for AnnData because the entries in the gaps are also decoded
+_SOMA_MAX_GAP = 16
+# read the joinids with one point query if they are grouped into more ranges
+_SOMA_MAX_RANGES = 32
+
+
+def _read_joinids(soma_df) -> np.ndarray:
+    """Read the sorted `soma_joinid` of a SOMA dataframe."""
+    table = soma_df.read(column_names=["soma_joinid"]).concat()
+    return np.sort(table["soma_joinid"].to_numpy())
+
+
+class _SOMARows:
+    """Read rows of a SOMA array by observation positions in joinid ranges."""
+
+    def __init__(
+        self,
+        array: SparseNDArray | DenseNDArray,
+        obs_joinids: np.ndarray,
+        var_joinids: np.ndarray | None,
+        n_cols: int,
+    ):
+        self.array = array
+        self.obs_joinids = obs_joinids
+        # None if the columns are the joinids of the second dimension
+        self.var_joinids = var_joinids
+        self.n_cols = n_cols
+
+    def read_rows(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray | None = None,
+        max_workers: int | None = None,
+    ) -> _PreloadedGroup | np.ndarray:
+        """Read the sorted unique rows, a csr group for sparse arrays.
+
+        If `cols` is passed, reads only these sorted columns of a sparse array.
+        """
+        joinids = self.obs_joinids[rows]
+        range_starts, range_ends, offsets = _coalesce_spans(
+            joinids, joinids + 1, _SOMA_MAX_GAP
+        )
+        if self.array.soma_type == "SOMADenseNDArray":
+            parts = _map_ordered(
+                lambda span: self.array.read(
+                    coords=(slice(int(span[0]), int(span[1]) - 1),)
+                ).to_numpy(),
+                zip(range_starts, range_ends),
+                max_workers,
+            )
+            return np.concatenate(parts, axis=0)[offsets]
+
+        col_coords: tuple = ()
+        if cols is not None:
+            col_joinids = cols if self.var_joinids is None else self.var_joinids[cols]
+            col_coords = (col_joinids,)
+        if len(range_starts) > _SOMA_MAX_RANGES:
+            obs_coords = [joinids]
+        else:
+            obs_coords = [
+                slice(int(start), int(end) - 1)
+                for start, end in zip(range_starts, range_ends)
+            ]
+        tables = _map_ordered(
+            lambda coords: self.array.read(coords=(coords, *col_coords))
+            .tables()
+            .concat(),
+            obs_coords,
+            max_workers,
+        )
+        dim_0 = np.concatenate([table["soma_dim_0"].to_numpy() for table in tables])
+        dim_1 = np.concatenate([table["soma_dim_1"].to_numpy() for table in tables])
+        data = np.concatenate([table["soma_data"].to_numpy() for table in tables])
+        # drop the entries of the rows in the gaps of the ranges
+        rows_out = np.searchsorted(joinids, dim_0)
+        keep = joinids[np.minimum(rows_out, len(joinids) - 1)] == dim_0
+        rows_out, dim_1, data = rows_out[keep], dim_1[keep], data[keep]
+        if self.var_joinids is None:
+            cols_out = dim_1
+        else:
+            cols_out = np.searchsorted(self.var_joinids, dim_1)
+        matrix = csr_matrix(
+            (data, (rows_out, cols_out)), shape=(len(joinids), self.n_cols)
+        )
+        return _PreloadedGroup(
+            {"data": matrix.data, "indices": matrix.indices, "indptr": matrix.indptr},
+            {"shape": matrix.shape},
+        )
+
+
+class SOMAMappedCollection(MappedCollection):
+    """Map-style collection of `tiledbsoma.Experiment` stores for use in data loaders.
+
+    Works like :class:`~lamindb.core.MappedCollection`, but reads the observations
+    from the ``measurement_name`` measurement of `tiledbsoma.Experiment` stores.
+    Observations of a batch are grouped into ranges of consecutive ``soma_joinid``
+    and read with batched queries of the `X` layers and ``.obsm``.
+    Labels from ``obs_keys`` and ``obs_filter`` columns are read once
+    with columnar reads of ``obs``.
+
+    The variables of the stores are identified by ``var_id_name`` in ``var``
+    for the joins and ``var_subset``.
+
+    It can be streamed with :class:`~lamindb.core.IterableMappedCollection`.
+
+    Args:
+        path_list: A list of paths to `tiledbsoma.Experiment` stores.
+        layers_keys: Names of the `X` layers of the measurement,
+            ``None`` reads the ``"data"`` layer.
+        obs_keys: Columns of ``obs``.
+        obsm_keys: Keys from ``.obsm`` of the measurement.
+        obs_filter: Select only observations with these values for the given obs columns,
+            see :class:`~lamindb.core.MappedCollection`.
+        join: `"inner"` or `"outer"` virtual joins. If ``None`` is passed,
+            does not join.
+        encode_labels: Encode labels into integers.
+            Can be a list with elements from ``obs_keys``.
+        unknown_label: Encode this label to -1.
+            Can be a dictionary with keys from ``obs_keys`` if ``encode_labels=True``
+            or from ``encode_labels`` if it is a list.
+        parallel: Enable sampling with multiple processes.
+        dtype: Convert numpy arrays from the `X` layers and ``.obsm``.
+        max_workers: The maximum number of threads to open the stores and
+            read the ranges concurrently.
+        output: Return the `X` layers as dense numpy arrays (``"dense"``) or as
+            `scipy.sparse.csr_matrix` rows (``"csr"``).
+        var_subset: Return only these variables of the `X` layers in this order.
+        measurement_name: The name of the measurement in the stores.
+        var_id_name: The column of ``var`` with the identifiers of the variables.
+    """
+
+    def __init__(
+        self,
+        path_list: list[UPathStr],
+        layers_keys: str | list[str] | None = None,
+        obs_keys: str | list[str] | None = None,
+        obsm_keys: str | list[str] | None = None,
+        obs_filter: tuple[str, str | tuple[str, ...]] | dict | None = None,
+        join: Literal["inner", "outer"] | None = "inner",
+        encode_labels: bool | list[str] = True,
+        unknown_label: str | dict[str, str] | None = None,
+        parallel: bool = False,
+        dtype: str | None = None,
+        max_workers: int | None = None,
+        output: Literal["dense", "csr"] = "dense",
+        var_subset: pd.Index | list[str] | None = None,
+        measurement_name: str = "RNA",
+        var_id_name: str = "var_id",
+    ):
+        self.measurement_name = measurement_name
+        self.var_id_name = var_id_name
+        # sorted joinids of obs and var by storage index
+        self._obs_joinids: dict[int, np.ndarray] = {}
+        self._var_joinids: list[np.ndarray] | None = None
+        super().__init__(
+            path_list,
+            layers_keys="data" if layers_keys is None else layers_keys,
+            obs_keys=obs_keys,
+            obsm_keys=obsm_keys,
+            obs_filter=obs_filter,
+            join=join,
+            encode_labels=encode_labels,
+            unknown_label=unknown_label,
+            cache_categories=False,
+            parallel=parallel,
+            dtype=dtype,
+            max_workers=max_workers,
+            output=output,
+            var_subset=var_subset,
+        )
+
+    def _make_connections(self, path_list: list, parallel: bool):
+        def connect(path):
+            return _open_tiledbsoma(create_path(path), mode="r")
+
+        for storage in _map_ordered(connect, path_list, self._max_workers):
+            self.conns.append(None)
+            self.storages.append(storage)
+
+    def _read_n_obs(self, store: Experiment, storage_idx: int) -> int:
+        self._obs_joinids[storage_idx] = _read_joinids(store["obs"])
+        return len(self._obs_joinids[storage_idx])
+
+    def _get_chunk_rows(self, storage_idx: int) -> int | None:
+        return None
+
+    def _read_obs_column(
+        self, store: Experiment, column: str
+    ) -> tuple[np.ndarray | None, np.ndarray]:
+        """Read categories and codes of an obs column, only values if not categorical.
+
+        The values are in the order of `soma_joinid`.
+        """
+        table = store["obs"].read(column_names=["soma_joinid", column]).concat()
+        order = np.argsort(table["soma_joinid"].to_numpy())
+        values = table[column].to_pandas()
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return values.cat.categories.to_numpy(), values.cat.codes.to_numpy()[order]
+        return None, values.to_numpy()[order]
+
+    def _select_obs(
+        self,
+        store: Experiment,
+        storage_idx: int,
+        column: str,
+        kind: str,
+        condition: list,
+    ) -> np.ndarray:
+        cats, codes = self._read_obs_column(store, column)
+        if cats is None:
+            return _select_values(codes, kind, condition)
+        return np.append(_select_values(cats, kind, condition), False)[codes]
+
+    def _read_label_codes(self, store: Experiment, label_key: str, storage_idx: int):
+        cats, codes = self._read_obs_column(store, label_key)
+        if cats is None:
+            cats, codes = np.unique(codes, return_inverse=True)
+        return np.asarray(cats), codes
+
+    def _get_categories(self, storage: Experiment, label_key: str):
+        return self._read_obs_column(storage, label_key)[0]
+
+    def _get_codes(self, storage: Experiment, label_key: str):
+        return self._read_obs_column(storage, label_key)[1]
+
+    def _get_labels(
+        self, storage: Experiment, label_key: str, storage_idx: int | None = None
+    ):
+        cats, codes = self._read_obs_column(storage, label_key)
+        return codes if cats is None else cats[codes]
+
+    def _read_vars(self):
+        def read_vars(storage):
+            var = storage["ms"][self.measurement_name]["var"]
+            table = var.read(column_names=["soma_joinid", self.var_id_name]).concat()
+            var_df = table.to_pandas().sort_values("soma_joinid")
+            return pd.Index(var_df[self.var_id_name]), var_df["soma_joinid"].to_numpy()
+
+        vars_joinids = _map_ordered(read_vars, self.storages, self._max_workers)
+        self.var_list = [vrs for vrs, _ in vars_joinids]
+        self._var_joinids = [joinids for _, joinids in vars_joinids]
+        self.n_vars_list = [len(vrs) for vrs in self.var_list]
+
+    def _get_lazy_data(
+        self, store: Experiment, storage_idx: int, key: str, slot: str = "layers"
+    ):
+        measurement = store["ms"][self.measurement_name]
+        obs_joinids = self._obs_joinids[storage_idx]
+        if slot == "obsm":
+            array = measurement["obsm"][key]
+            return _SOMARows(array, obs_joinids, None, array.shape[1])
+        if self.var_list is None:
+            self._read_vars()
+        return _SOMARows(
+            measurement["X"][key],
+            obs_joinids,
+            self._var_joinids[storage_idx],  # type: ignore
+            self.n_vars_list[storage_idx],  # type: ignore
+        )
+
+    def _get_data_idx(
+        self,
+        lazy_data: _SOMARows,
+        idx: int,
+        join_vars: Literal["inner", "outer"] | None = None,
+        var_idxs_join: list | None = None,
+        n_vars_out: int | None = None,
+    ):
+        return self._get_data_idxs(
+            lazy_data, np.array([idx]), join_vars, var_idxs_join, n_vars_out
+        )[0]
+
+    def _get_data_idxs(
+        self,
+        lazy_data: _SOMARows,
+        idxs: np.ndarray,
+        join_vars: Literal["inner", "outer"] | None = None,
+        var_idxs_join: list | None = None,
+        n_vars_out: int | None = None,
+        sparse: bool = False,
+        var_select: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None,
+    ):
+        # read only the columns which are returned
+        if var_select is not None:
+            cols = var_select[0]
+        elif join_vars == "inner":
+            cols = np.sort(var_idxs_join)  # type: ignore
+        else:
+            cols = None
+        idxs_uniq, idxs_inverse = np.unique(idxs, return_inverse=True)
+        rows = lazy_data.read_rows(idxs_uniq, cols, self._max_workers)
+        return super()._get_data_idxs(
+            rows,
+            idxs_inverse,
+            join_vars,
+            var_idxs_join,
+            n_vars_out,
+            sparse=sparse,
+            var_select=var_select,
+        )
+
+    def get_meta(self) -> pd.DataFrame:
+        """Not supported for `tiledbsoma.Experiment` stores.
+
+        The rows of the stores are read by their `soma_joinid`, which have to be
+        read from ``obs`` at init anyway, so there is no metadata to pass as ``meta``.
+        """
+        raise TypeError(
+            "SOMAMappedCollection has no metadata to cache: the soma_joinid of the"
+            " observations are read from the tiledbsoma stores at init."
+        )
@@ -21,6 +21,7 @@
    anndata_human_immune_cells
    anndata_pbmc68k_reduced
    anndata_file_pbmc68k_test
+   anndata_file_synthetic
    anndata_pbmc3k_processed
    anndata_with_obs
    anndata_suo22_Visium10X
@@ -32,6 +33,7 @@
 
 from ._core import (
     anndata_file_pbmc68k_test,
+    anndata_file_synthetic,
     anndata_human_immune_cells,
     anndata_mouse_sc_lymph_node,
     anndata_pbmc3k_processed,
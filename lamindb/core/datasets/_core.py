@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 from urllib.request import urlretrieve
 
 import anndata as ad
@@ -369,6 +369,75 @@ def anndata_with_obs() -> ad.AnnData:
     return adata
 
 
+def anndata_file_synthetic(
+    n_obs: int = 10_000,
+    n_vars: int = 2_000,
+    sparse: bool = True,
+    density: float = 0.1,
+    format: Literal["h5ad", "zarr"] = "h5ad",
+    var_offset: int = 0,
+    seed: int = 0,
+    filepath: str | Path | None = None,
+) -> Path:
+    """Write a synthetic `AnnData` with random counts, returns the filepath.
+
+    ``.obs`` has categorical ``cell_type`` and ``batch`` columns and ``.obsm``
+    has a dense ``X_pca`` embedding. Useful for benchmarks of data loading.
+
+    Args:
+        n_obs: The number of observations.
+        n_vars: The number of variables.
+        sparse: Write ``.X`` as a csr matrix if `True`, dense otherwise.
+        density: The fraction of non-zero entries of ``.X``.
+        format: Write `.h5ad` or `.zarr`.
+        var_offset: The variables are named ``gene_{var_offset}`` to
+            ``gene_{var_offset + n_vars - 1}``, shift it to get files
+            with partially overlapping variables.
+        seed: The seed for the random number generator.
+        filepath: Where to write, defaults to a name from the parameters
+            in the current directory.
+    """
+    from scipy.sparse import random as sparse_random
+
+    rng = np.random.default_rng(seed)
+    X = sparse_random(
+        n_obs,
+        n_vars,
+        density=density,
+        format="csr",
+        dtype=np.float32,
+        random_state=rng,
+        data_rvs=lambda size: rng.poisson(2.0, size) + 1,
+    )
+    if not sparse:
+        X = X.toarray()
+    obs = pd.DataFrame(
+        {
+            "cell_type": pd.Categorical(
+                rng.choice(["T cell", "B cell", "NK cell", "monocyte"], n_obs)
+            ),
+            "batch": pd.Categorical(rng.choice(["b1", "b2", "b3"], n_obs)),
+        },
+        index=[f"cell_{i}" for i in range(n_obs)],
+    )
+    var = pd.DataFrame(
+        index=[f"gene_{i}" for i in range(var_offset, var_offset + n_vars)]
+    )
+    obsm = {"X_pca": rng.normal(size=(n_obs, 50)).astype(np.float32)}
+    adata = ad.AnnData(X, obs=obs, var=var, obsm=obsm)
+    if filepath is None:
+        filepath = (
+            f"synthetic_{n_obs}x{n_vars}_{'sparse' if sparse else 'dense'}"
+            f"_{var_offset}_{seed}.{format}"
+        )
+    filepath = Path(filepath)
+    if format == "zarr":
+        adata.write_zarr(filepath)
+    else:
+        adata.write_h5ad(filepath)
+    return filepath
+
+
 def anndata_suo22_Visium10X():  # pragma: no cover
     """AnnData from Suo22 generated by 10x Visium."""
     import anndata as ad
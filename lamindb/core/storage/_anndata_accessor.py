@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import inspect
-from functools import cached_property
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import cached_property, partial
 from itertools import chain
 from typing import TYPE_CHECKING, Callable, Literal, Union
 
@@ -19,6 +22,11 @@ from fsspec.implementations.local import LocalFileSystem
 from lamin_utils import logger
 from lamindb_setup.core.upath import UPath, create_mapper, infer_filesystem
 from packaging import version
+from scipy.sparse import csr_matrix
+
+from lamindb.core.subsettings._block_cache_settings import block_cache_settings
+
+from ._block_cache import BlockCachedFile
 
 if TYPE_CHECKING:
     from collections.abc import Mapping
@@ -71,6 +79,159 @@ else:
     CSRDataset._check_group_format = _check_group_format
 
 
+# spans of an array which are separated by fewer elements than this
+# are read with one request in batched access
+_MAX_GAP = 1024
+# gaps of unchunked arrays up to this size are read instead of making another request,
+# larger gaps make random batches read more than single reads of the rows
+_MAX_GAP_BYTES = 64 * 1024
+
+
+def _coalesce_spans(starts: np.ndarray, ends: np.ndarray, max_gap: int = _MAX_GAP):
+    """Merge sorted `[start, end)` spans into ranges for bulk reading.
+
+    Returns starts and ends of the merged ranges and the offsets of the spans
+    in the concatenation of the merged ranges.
+    """
+    breaks = np.flatnonzero(starts[1:] - ends[:-1] > max_gap) + 1
+    first = np.concatenate(([0], breaks))
+    last = np.concatenate((breaks, [len(starts)])) - 1
+    range_starts, range_ends = starts[first], ends[last]
+    range_offsets = np.concatenate(([0], np.cumsum(range_ends - range_starts)[:-1]))
+    range_ids = np.repeat(np.arange(len(first)), last - first + 1)
+    offsets = starts - range_starts[range_ids] + range_offsets[range_ids]
+    return range_starts, range_ends, offsets
+
+
+def _max_gap(elem) -> int:
+    """The gap threshold for coalescing reads of the first axis of an array.
+
+    All rows of a chunk are read anyway, so gaps within a chunk cost nothing.
+    """
+    chunks = getattr(elem, "chunks", None)
+    if chunks is not None:
+        return chunks[0]
+    row_nbytes = elem.dtype.itemsize * int(np.prod(elem.shape[1:]))
+    return max(_MAX_GAP_BYTES // max(row_nbytes, 1), 1)
+
+
+def _read_cols(elem, start: int, end: int, cols: np.ndarray | slice):
+    """Read the rows `[start, end)` of a 2d array only for the sorted columns."""
+    if isinstance(cols, slice):
+        return elem[start:end, cols]
+    if hasattr(elem, "oindex"):  # zarr reads only the chunks with the columns
+        return elem.oindex[start:end, cols]
+    # one hyperslab spanning the columns for h5py, fancy indexing is slow there
+    return elem[start:end, cols[0] : cols[-1] + 1][:, cols - cols[0]]
+
+
+def _read_spans(
+    elem,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    max_gap: int | None = None,
+    cols: np.ndarray | slice | None = None,
+):
+    """Read sorted `[start, end)` spans of the first axis with coalesced requests.
+
+    `max_gap` defaults to :func:`_max_gap` of `elem`.
+    If `cols` is passed, reads only these sorted columns of a 2d array.
+    Returns the concatenated data and the offsets of the spans in it.
+    """
+    if max_gap is None:
+        max_gap = _max_gap(elem)
+    range_starts, range_ends, offsets = _coalesce_spans(starts, ends, max_gap)
+
+    def read(start, end):
+        return elem[start:end] if cols is None else _read_cols(elem, start, end, cols)
+
+    if len(range_starts) == 1:
+        data = read(range_starts[0], range_ends[0])
+    else:
+        data = np.concatenate(
+            [read(s, e) for s, e in zip(range_starts, range_ends)], axis=0
+        )
+    return data, offsets
+
+
+def _gather_spans(offsets: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Positions of the elements of spans with these offsets and lengths."""
+    cum_lengths = np.cumsum(lengths)
+    gather = np.arange(cum_lengths[-1] if len(cum_lengths) > 0 else 0)
+    gather += np.repeat(offsets - cum_lengths + lengths, lengths)
+    return gather
+
+
+def _read_rows(elem, rows, cols=None):
+    """Read rows of an array, integer rows with coalesced requests.
+
+    Integer rows and columns should be sorted and unique.
+    """
+    if isinstance(rows, np.ndarray) and rows.dtype == bool:
+        rows = np.flatnonzero(rows)
+    if isinstance(cols, np.ndarray) and cols.dtype == bool:
+        cols = np.flatnonzero(cols)
+    if (
+        not isinstance(rows, np.ndarray)
+        or len(rows) == 0
+        or (isinstance(cols, np.ndarray) and len(cols) == 0)
+    ):
+        return elem[rows] if cols is None else elem[rows, cols]
+    data, offsets = _read_spans(elem, rows, rows + 1, _max_gap(elem), cols)
+    return data[offsets]
+
+
+def _read_dataframe_rows(elem, indices):
+    """Read rows of a dataframe group, integer rows with coalesced requests."""
+    rows = indices[0]
+    if isinstance(rows, np.ndarray) and rows.dtype == bool:
+        rows = np.flatnonzero(rows)
+    if not isinstance(rows, np.ndarray) or len(rows) == 0:
+        return read_elem_partial(elem, indices=indices)
+    rows_uniq, rows_inverse = np.unique(rows, return_inverse=True)
+    index_elem = elem[_read_attr(elem.attrs, "_index")]
+    range_starts, range_ends, offsets = _coalesce_spans(
+        rows_uniq, rows_uniq + 1, _max_gap(index_elem)
+    )
+    parts = [
+        read_elem_partial(elem, indices=(slice(int(start), int(end)), indices[1]))
+        for start, end in zip(range_starts, range_ends)
+    ]
+    df = parts[0] if len(parts) == 1 else pd.concat(parts)
+    return df.iloc[offsets[rows_inverse]]
+
+
+def _subset_csr(sparse_ds: CSRDataset | SparseDataset, indices) -> csr_matrix:
+    """Subset a csr dataset, the rows are read with coalesced requests."""
+    rows, cols = indices
+    n_rows, n_cols = sparse_ds.shape
+    if isinstance(rows, slice):
+        rows = np.arange(*rows.indices(n_rows))
+    elif rows.dtype == bool:
+        rows = np.flatnonzero(rows)
+    if len(rows) == 0:
+        return sparse_ds[indices]
+    rows_uniq, rows_inverse = np.unique(rows, return_inverse=True)
+    group = sparse_ds.group
+    # read the indptr pairs of the rows with coalesced requests
+    indptr, ptr_offsets = _read_spans(group["indptr"], rows_uniq, rows_uniq + 2)
+    starts, ends = indptr[ptr_offsets], indptr[ptr_offsets + 1]
+    max_gap = _max_gap(group["data"])
+    data, offsets = _read_spans(group["data"], starts, ends, max_gap)
+    col_idxs, _ = _read_spans(group["indices"], starts, ends, max_gap)
+    # gather the entries of the rows in the requested order
+    lengths = (ends - starts)[rows_inverse]
+    gather = _gather_spans(offsets[rows_inverse], lengths)
+    result_indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=result_indptr[1:])
+    result = csr_matrix(
+        (data[gather], col_idxs[gather], result_indptr), shape=(len(rows), n_cols)
+    )
+    if isinstance(cols, slice) and cols == slice(None):
+        return result
+    return result[:, cols]
+
+
 # zarr and CSRDataset have problems with full selection
 def _subset_sparse(sparse_ds: CSRDataset | SparseDataset, indices):
     has_arrays = isinstance(indices[0], np.ndarray) or isinstance(
@@ -78,10 +239,103 @@ def _subset_sparse(sparse_ds: CSRDataset | SparseDataset, indices):
     )
     if not has_arrays and indices == (slice(None), slice(None)):
         return sparse_ds.to_memory()
+    elif _is_csr(sparse_ds):
+        return _subset_csr(sparse_ds, indices)
     else:
         return sparse_ds[indices]
 
 
+def _is_csr(sparse_ds: CSRDataset | SparseDataset) -> bool:
+    # the format attribute was called format_str before anndata 0.10
+    if anndata_version_parse < version.parse("0.10.0"):
+        return sparse_ds.format_str == "csr"
+    return sparse_ds.format == "csr"
+
+
+# the target size of the blocks of the dask arrays from to_dask
+_DASK_BLOCK_BYTES = 64 * 1024**2
+
+
+def _block_size(chunk_size: int | None, item_nbytes: int) -> int:
+    """Items in a block of about `_DASK_BLOCK_BYTES`, a multiple of the chunk size."""
+    size = max(_DASK_BLOCK_BYTES // max(item_nbytes, 1), 1)
+    if chunk_size:
+        size = max(size // chunk_size, 1) * chunk_size
+    return size
+
+
+class _CSRRows:
+    """Array-like selected rows and columns of a csr dataset for dask.
+
+    Reads blocks of rows as `csr_matrix` with coalesced requests.
+    """
+
+    ndim = 2
+
+    def __init__(self, sparse_ds: CSRDataset | SparseDataset, rows: np.ndarray, cols):
+        self.sparse_ds = sparse_ds
+        self.rows = rows
+        self.cols = cols
+        n_cols = len(np.arange(sparse_ds.shape[1])[cols])
+        self.shape = (len(rows), n_cols)
+        self.dtype = sparse_ds.group["data"].dtype
+
+    def __getitem__(self, key: tuple[slice, slice]) -> csr_matrix:
+        rows_key, cols_key = key
+        rows = self.rows[rows_key]
+        if len(rows) == 0:
+            return csr_matrix((0, self.shape[1]), dtype=self.dtype)[:, cols_key]
+        return _subset_csr(self.sparse_ds, (rows, self.cols))[:, cols_key]
+
+
+def _to_dask(elem, indices):
+    """Wrap a dense or csr element as a dask array, subset by `indices`."""
+    try:
+        import dask.array as da
+    except ImportError:
+        raise ImportError("Please install dask: pip install dask[array]") from None
+
+    rows, cols = indices
+    elem = _try_backed_full(elem)
+    if isinstance(elem, ArrayTypes):
+        chunks = getattr(elem, "chunks", None)
+        row_nbytes = elem.dtype.itemsize * int(np.prod(elem.shape[1:]))
+        block_rows = _block_size(chunks[0] if chunks else None, row_nbytes)
+        array = da.from_array(elem, chunks=(block_rows,) + (-1,) * (elem.ndim - 1))
+        if not (isinstance(rows, slice) and rows == slice(None)):
+            array = array[rows]
+        if not (isinstance(cols, slice) and cols == slice(None)):
+            array = array[:, cols]
+        return array
+    if not isinstance(elem, SparseDataset) or not _is_csr(elem):
+        raise ValueError("Only dense arrays and csr matrices can be exported to dask.")
+
+    n_rows = elem.shape[0]
+    if isinstance(rows, slice):
+        rows = np.arange(*rows.indices(n_rows))
+    elif rows.dtype == bool:
+        rows = np.flatnonzero(rows)
+    if isinstance(cols, np.ndarray) and cols.dtype == bool:
+        cols = np.flatnonzero(cols)
+    indptr = elem.group["indptr"][...]
+    data = elem.group["data"]
+    item_nbytes = data.dtype.itemsize + elem.group["indices"].dtype.itemsize
+    block_nnz = _block_size(data.chunks[0] if data.chunks else None, item_nbytes)
+    # a block starts at the first row with entries past a multiple of block_nnz,
+    # for all rows the blocks follow the chunks of the data
+    lengths = indptr[rows + 1] - indptr[rows]
+    block_ids = (np.cumsum(lengths) - lengths) // block_nnz
+    row_chunks = tuple(np.unique(block_ids, return_counts=True)[1].tolist())
+    csr_rows = _CSRRows(elem, rows, cols)
+    return da.from_array(
+        csr_rows,
+        chunks=(row_chunks or (0,), (csr_rows.shape[1],)),
+        asarray=False,
+        fancy=False,
+        meta=csr_matrix((0, 0), dtype=csr_rows.dtype),
+    )
+
+
 def get_module_name(obj):
     return inspect.getmodule(obj).__name__.partition(".")[0]
 
@@ -165,7 +419,10 @@ def open(filepath: UPathStr, mode: str = "r"):
         conn_mode = "ab"
     else:
         raise ValueError(f"Unknown mode {mode}! Should be 'r', 'w' or 'a'.")
-    conn = fs.open(file_path_str, mode=conn_mode)
+    if mode == "r" and block_cache_settings.enabled:
+        conn = BlockCachedFile(fs, file_path_str)
+    else:
+        conn = fs.open(file_path_str, mode=conn_mode)
     try:
         storage = h5py.File(conn, mode=mode)
     except Exception as e:
@@ -213,12 +470,12 @@ def safer_read_partial(elem, indices):
         if is_dataset:
             dims = len(elem.shape)
             if dims == 2:
-                result = elem[indices]
+                result = _read_rows(elem, *indices)
             elif dims == 1:
                 if indices[0] == slice(None):
-                    result = elem[indices[1]]
+                    result = _read_rows(elem, indices[1])
                 elif indices[1] == slice(None):
-                    result = elem[indices[0]]
+                    result = _read_rows(elem, indices[0])
         elif isinstance(elem, h5py.Group):
             try:
                 ds = CSRDataset(elem)
@@ -232,6 +489,12 @@ def safer_read_partial(elem, indices):
                 "Can not get a subset of the element of type"
                 f" {type(elem).__name__} with an empty spec."
             )
+    elif encoding_type == "array" and len(elem.shape) == 2:
+        result = _read_rows(elem, *indices)
+    elif encoding_type == "dataframe":
+        result = _read_dataframe_rows(elem, indices)
+    elif encoding_type in ("csr_matrix", "csc_matrix"):
+        result = _subset_sparse(sparse_dataset(elem), indices)
     else:
         result = read_elem_partial(elem, indices=indices)
     if indices_inverse is None:
@@ -248,7 +511,7 @@ def safer_read_partial(elem, indices):
             else:
                 return result[indices_inverse[0]]
         else:
-            return result[tuple(indices_inverse)]
+            return result[np.ix_(*indices_inverse)]
 
 
 @registry.register("h5py")
@@ -337,6 +600,8 @@ if ZARR_INSTALLED:
             if encoding_type in ("csr_matrix", "csc_matrix"):
                 ds = sparse_dataset(elem)
                 return _subset_sparse(ds, indices)
+            elif encoding_type == "dataframe":
+                return _read_dataframe_rows(elem, indices)
             else:
                 return read_elem_partial(elem, indices=indices)
 
@@ -395,7 +660,7 @@ StorageType = Union[StorageTypes]  # type: ignore
 def _to_memory(elem):
     if isinstance(elem, ArrayTypes):
         return elem[()]
-    elif isinstance(elem, SparseDataset):
+    elif isinstance(elem, (SparseDataset, _LazyDataFrame)):
         return elem.to_memory()
     else:
         return elem
@@ -437,6 +702,144 @@ def _safer_read_index(elem):
         raise ValueError(f"Unknown elem type {type(elem)} when reading indices.")
 
 
+class _LazyDataFrame:
+    """Lazy view of a backed obs or var dataframe.
+
+    Columns are read on first access as `pd.Series` with the obs or var names
+    as the index, categoricals are read as codes and categories.
+    Comparisons of the columns give boolean masks for subsetting,
+    for example ``access[access.obs_lazy["cell_type"] == "T cell"]``.
+    Other `pd.DataFrame` attributes and methods, like ``.head()``, ``.loc``
+    or ``.iloc``, are taken from the whole dataframe, which is read once on
+    their first use.
+    """
+
+    def __init__(self, elem, index: pd.Index, name: str):
+        self._elem = elem
+        self._name = name
+        self._cache: dict[str, pd.Series] = {}
+        self.index = index
+
+    @cached_property
+    def _full(self) -> pd.DataFrame | None:
+        # legacy structured arrays are read at once
+        if isinstance(self._elem, GroupTypes):
+            return None
+        return _records_to_df(registry.read_dataframe(self._elem))
+
+    @cached_property
+    def columns(self) -> pd.Index:
+        if self._full is not None:
+            return self._full.columns
+        return pd.Index(_read_attr(self._elem.attrs, "column-order"))
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.index), len(self.columns)
+
+    def keys(self) -> pd.Index:
+        return self.columns
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.columns
+
+    @cached_property
+    def _df(self) -> pd.DataFrame:
+        df = self.to_memory()
+        df.index = self.index
+        return df
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __getitem__(self, key):
+        if isinstance(key, list) and all(isinstance(k, str) for k in key):
+            return pd.DataFrame({k: self[k] for k in key}, index=self.index)
+        if not isinstance(key, str):
+            # boolean masks, slices and so on
+            return self._df[key]
+        if key not in self.columns:
+            raise KeyError(key)
+        if key not in self._cache:
+            if "_df" in self.__dict__:
+                values = self._df[key].to_numpy()
+            elif self._full is not None:
+                values = self._full[key].to_numpy()
+            else:
+                values = read_elem(self._elem[key])
+            self._cache[key] = pd.Series(values, index=self.index, name=key)
+        return self._cache[key]
+
+    def __getattr__(self, name: str):
+        if not name.startswith("_"):
+            if name in self.columns:
+                return self[name]
+            if hasattr(pd.DataFrame, name):
+                return getattr(self._df, name)
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def __repr__(self):
+        """Description of the _LazyDataFrame object."""
+        descr = f"Lazy dataframe for the AnnData attribute {self._name}"
+        descr += f"\n  with {len(self)} rows and columns: {self.columns.tolist()}"
+        return descr
+
+    def to_memory(self) -> pd.DataFrame:
+        """Read the whole dataframe."""
+        if self._full is not None:
+            return self._full
+        return registry.read_dataframe(self._elem)
+
+
+def _read_to_memory(accessor, attr: str, key: str | None = None):
+    elem = getattr(accessor, attr)
+    return _to_memory(elem if key is None else elem[key])
+
+
+# the default limit for the estimated size of concurrent reads in to_memory
+_MAX_INFLIGHT_BYTES = 1024**3
+
+
+def _estimate_nbytes(elem, fraction: float) -> int:
+    """Rough size in memory of a fraction of the entries of a stored element."""
+    if isinstance(elem, ArrayTypes):
+        return int(elem.dtype.itemsize * int(np.prod(elem.shape)) * fraction)
+    # sparse matrices, dataframes and their categorical or nullable columns
+    return sum(_estimate_nbytes(elem[key], fraction) for key in elem)
+
+
+class _ByteBudget:
+    """Limit the total estimated size of concurrent reads.
+
+    A read larger than the limit runs alone.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, nbytes: int):
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._in_flight == 0
+                or self._in_flight + nbytes <= self.max_bytes
+            )
+            self._in_flight += nbytes
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= nbytes
+                self._condition.notify_all()
+
+
 class _MapAccessor:
     def __init__(self, elem, name, indices=None):
         self.elem = elem
@@ -556,32 +959,117 @@ class _AnnDataAttrsMixin:
     def shape(self):
         return len(self._obs_names), len(self._var_names)
 
-    def to_dict(self):
-        prepare_adata = {}
+    def to_dask(self, layer: str | None = None):
+        """Get `X` or a layer as a lazy `dask.array.Array`.
+
+        Dense arrays give blocks of rows which are multiples of the stored chunks.
+        csr matrices give `scipy.sparse.csr_matrix` blocks of rows
+        following the chunks of the stored entries, read with coalesced requests,
+        reduce them with `map_blocks`.
+        The selection of a subset is a part of the dask graph,
+        so computations only read the subset, block by block.
+
+        Args:
+            layer: The key of a layer, `X` if `None`.
+        """
+        if layer is None:
+            elem = self.storage["X"]
+        else:
+            elem = self.storage["layers"][layer]
+        indices = getattr(self, "indices", None)
+        if indices is None:
+            indices = (slice(None), slice(None))
+        return _to_dask(elem, indices)
 
-        prepare_adata["X"] = _to_memory(self.X)
+    def _read_tasks(self) -> list[tuple[tuple[str, ...], Callable, int]]:
+        """The reads of all elements as `(path, read, estimated size)`."""
+        n_obs, n_vars = self.shape
+        ref_obs, ref_vars = getattr(self, "_ref_shape", None) or self.shape
+        obs_frac, var_frac = n_obs / max(ref_obs, 1), n_vars / max(ref_vars, 1)
+        fractions = {
+            "X": obs_frac * var_frac,
+            "obs": obs_frac,
+            "var": var_frac,
+            "obsm": obs_frac,
+            "varm": var_frac,
+            "obsp": obs_frac**2,
+            "varp": var_frac**2,
+            "layers": obs_frac * var_frac,
+        }
+
+        tasks: list[tuple[tuple[str, ...], Callable, int]] = []
+        x_nbytes = _estimate_nbytes(self.storage["X"], fractions["X"])
+        tasks.append((("X",), partial(_read_to_memory, self, "X"), x_nbytes))
 
         if "uns" in self._attrs_keys:
-            prepare_adata["uns"] = self.uns
+            tasks.append((("uns",), partial(_read_to_memory, self, "uns"), 0))
 
         for attr in ("obs", "var"):
             if attr in self._attrs_keys:
-                prepare_adata[attr] = getattr(self, attr)
+                nbytes = _estimate_nbytes(self.storage[attr], fractions[attr])
+                tasks.append(((attr,), partial(_read_to_memory, self, attr), nbytes))
 
         for attr in ("obsm", "varm", "obsp", "varp", "layers"):
             if attr in self._attrs_keys:
-                prepare_adata[attr] = {}
-                get_attr = getattr(self, attr)
                 for key in self._attrs_keys[attr]:
-                    prepare_adata[attr][key] = _to_memory(get_attr[key])
+                    nbytes = _estimate_nbytes(self.storage[attr][key], fractions[attr])
+                    read = partial(_read_to_memory, self, attr, key)
+                    tasks.append(((attr, key), read, nbytes))
 
         if "raw" in self._attrs_keys:
-            prepare_adata["raw"] = self.raw.to_dict()
+            for path, read, nbytes in self.raw._read_tasks():
+                tasks.append((("raw", *path), read, nbytes))
+
+        return tasks
 
+    def to_dict(
+        self,
+        max_workers: int | None = None,
+        max_inflight_bytes: int = _MAX_INFLIGHT_BYTES,
+    ) -> dict:
+        """Read all elements into a dictionary of `AnnData` arguments.
+
+        The elements of zarr stores, including the arrays in ``.obsm`` or ``.layers``,
+        are read concurrently. A read starts only if the estimated size of the reads
+        in flight stays within ``max_inflight_bytes``. h5py serializes all reads
+        in a process, so the elements of `.h5ad` files are read one after another.
+
+        Args:
+            max_workers: The maximum number of threads reading zarr elements.
+            max_inflight_bytes: The limit for the estimated size of the concurrent reads.
+        """
+        tasks = self._read_tasks()
+        if get_module_name(self.storage) == "zarr" and max_workers != 1:
+            budget = _ByteBudget(max_inflight_bytes)
+
+            def run(task):
+                _, read, nbytes = task
+                with budget.reserve(nbytes):
+                    return read()
+
+            with ThreadPoolExecutor(max_workers) as executor:
+                results = list(executor.map(run, tasks))
+        else:
+            results = [read() for _, read, _ in tasks]
+
+        prepare_adata: dict = {}
+        for (path, _, _), result in zip(tasks, results):
+            target = prepare_adata
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = result
         return prepare_adata
 
-    def to_memory(self):
-        adata = AnnData(**self.to_dict())
+    def to_memory(
+        self,
+        max_workers: int | None = None,
+        max_inflight_bytes: int = _MAX_INFLIGHT_BYTES,
+    ) -> AnnData:
+        """Read all elements into an `AnnData` object.
+
+        See :meth:`to_dict` for the arguments.
+        """
+        adata = AnnData(**self.to_dict(max_workers, max_inflight_bytes))
         return adata
 
 
@@ -682,19 +1170,27 @@ class AnnDataAccessor(_AnnDataAttrsMixin):
         connection: OpenFile | None,
         storage: StorageType,
         filename: str,
+        _metadata: tuple[Mapping[str, list], pd.Index, pd.Index] | None = None,
     ):
         self._conn = connection
         self.storage = storage
 
-        self._attrs_keys = registry.keys(self.storage)
-
         self._name = filename
 
-        self._obs_names = _safer_read_index(self.storage["obs"])  # type: ignore
-        self._var_names = _safer_read_index(self.storage["var"])  # type: ignore
+        # keys, obs_names and var_names from an earlier access to the same file
+        if _metadata is not None:
+            self._attrs_keys, self._obs_names, self._var_names = _metadata
+        else:
+            self._attrs_keys = registry.keys(self.storage)
+            self._obs_names = _safer_read_index(self.storage["obs"])  # type: ignore
+            self._var_names = _safer_read_index(self.storage["var"])  # type: ignore
 
         self._closed = False
 
+    @property
+    def _metadata(self) -> tuple[Mapping[str, list], pd.Index, pd.Index]:
+        return self._attrs_keys, self._obs_names, self._var_names
+
     def close(self):
         """Closes the connection."""
         if hasattr(self, "storage") and hasattr(self.storage, "close"):
@@ -735,6 +1231,20 @@ class AnnDataAccessor(_AnnDataAttrsMixin):
             descr += f"\n    {attr}: {keys}"
         return descr
 
+    @cached_property
+    def obs_lazy(self) -> _LazyDataFrame | None:
+        """Lazy view of `.obs`, which reads the columns on first access."""
+        if "obs" not in self._attrs_keys:
+            return None
+        return _LazyDataFrame(self.storage["obs"], self._obs_names, "obs")  # type: ignore
+
+    @cached_property
+    def var_lazy(self) -> _LazyDataFrame | None:
+        """Lazy view of `.var`, which reads the columns on first access."""
+        if "var" not in self._attrs_keys:
+            return None
+        return _LazyDataFrame(self.storage["var"], self._var_names, "var")  # type: ignore
+
     @cached_property
     def raw(self):
         if "raw" not in self._attrs_keys:
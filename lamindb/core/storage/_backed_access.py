@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Callable
 
@@ -69,6 +71,7 @@ def backed_access(
     artifact_or_filepath: Artifact | UPath,
     mode: str = "r",
     using_key: str | None = None,
+    _metadata: tuple | None = None,
 ) -> (
     AnnDataAccessor | BackedAccessor | SOMACollection | SOMAExperiment | PyArrowDataset
 ):
@@ -101,6 +104,162 @@ def backed_access(
     if is_anndata:
         if mode != "r":
             raise ValueError("Can only access `AnnData` with mode='r'.")
-        return AnnDataAccessor(conn, storage, name)
+        return AnnDataAccessor(conn, storage, name, _metadata=_metadata)
     else:
         return BackedAccessor(conn, storage)
+
+
+# the number of unused handles kept open and of cached metadata in the pool
+_MAX_IDLE_HANDLES = 8
+_MAX_METADATA = 128
+
+
+@dataclass
+class _PoolEntry:
+    access: AnnDataAccessor
+    refs: int = 0
+    # another version of the artifact was opened, close when released
+    stale: bool = False
+
+
+class _PooledAnnDataAccessor:
+    """A reference to an `AnnDataAccessor` shared through :data:`handle_pool`.
+
+    Closing the reference releases it, the pool closes the shared handle
+    once it is unused and evicted.
+    """
+
+    def __init__(self, access: AnnDataAccessor, pool: HandlePool, key: tuple):
+        self._access = access
+        self._pool = pool
+        self._key = key
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed or self._access.closed
+
+    def close(self):
+        """Releases the reference to the shared handle."""
+        if not self._closed:
+            self._closed = True
+            self._pool.release(self._key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _check_open(self):
+        if self.closed:
+            raise ValueError("The AnnDataAccessor is closed.")
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        self._check_open()
+        return getattr(self._access, name)
+
+    def __getitem__(self, index):
+        self._check_open()
+        return self._access[index]
+
+    def __repr__(self):
+        return repr(self._access)
+
+
+class HandlePool:
+    """Process-wide pool of `AnnDataAccessor` handles of artifacts.
+
+    Handles are keyed by `(uid, hash, mode)` of the artifact and counted
+    by reference, every `open` returns a new reference to the shared accessor
+    and is paired with a `close` of this reference.
+    Unused handles stay open for later calls, the least recently used ones are
+    closed beyond `max_idle`. Opening another version of an artifact closes the
+    handles of the other versions once they are released.
+
+    The keys and the indices of closed handles are kept to open them again
+    without reading the metadata.
+    """
+
+    def __init__(self, max_idle: int = _MAX_IDLE_HANDLES):
+        self.max_idle = max_idle
+        self._entries: OrderedDict[tuple, _PoolEntry] = OrderedDict()
+        self._metadata: OrderedDict[tuple, tuple] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def open(self, key: tuple, opener: Callable[[tuple | None], Any]) -> Any:
+        """Get the shared handle for `key` or open it with `opener(metadata)`.
+
+        Objects other than `AnnDataAccessor` are returned without pooling.
+        """
+        with self._lock:
+            self._drop_other_versions(key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refs += 1
+                self._entries.move_to_end(key)
+                return _PooledAnnDataAccessor(entry.access, self, key)
+            metadata = self._metadata.get(key)
+        # open outside of the lock, slow opens don't block the other keys
+        access = opener(metadata)
+        if type(access) is not AnnDataAccessor:
+            return access
+        with self._lock:
+            self._drop_other_versions(key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                # another thread opened the same key meanwhile, use its handle
+                access.close()
+                entry.refs += 1
+                self._entries.move_to_end(key)
+                return _PooledAnnDataAccessor(entry.access, self, key)
+            self._entries[key] = _PoolEntry(access, refs=1)
+            self._metadata[key] = access._metadata
+            self._metadata.move_to_end(key)
+            while len(self._metadata) > _MAX_METADATA:
+                self._metadata.popitem(last=False)
+            self._evict()
+            return _PooledAnnDataAccessor(access, self, key)
+
+    def release(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs = max(entry.refs - 1, 0)
+            if entry.refs == 0 and entry.stale:
+                self._close(key)
+            self._evict()
+
+    def clear(self):
+        """Close all handles, also the ones in use."""
+        with self._lock:
+            for key in list(self._entries):
+                self._close(key)
+            self._metadata.clear()
+
+    def _close(self, key: tuple):
+        self._entries.pop(key).access.close()
+
+    def _evict(self):
+        idle = [key for key, entry in self._entries.items() if entry.refs == 0]
+        for key in idle[: max(len(idle) - self.max_idle, 0)]:
+            self._close(key)
+
+    def _drop_other_versions(self, key: tuple):
+        uid, hash = key[0], key[1]
+        for other_key, entry in list(self._entries.items()):
+            if other_key[0] != uid or other_key[1] == hash:
+                continue
+            if entry.refs == 0:
+                self._close(other_key)
+            else:
+                entry.stale = True
+        for other_key in list(self._metadata):
+            if other_key[0] == uid and other_key[1] != hash:
+                del self._metadata[other_key]
+
+
+handle_pool = HandlePool()
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import io
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+from lamindb_setup import settings as setup_settings
+from lamindb_setup.core.hashing import hash_and_encode_as_b62
+
+from lamindb.core.subsettings._block_cache_settings import block_cache_settings
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from fsspec import AbstractFileSystem
+
+# fields of fsspec file infos which change when a file changes, by preference
+_VERSION_KEYS = (
+    "ETag",
+    "etag",
+    "md5Hash",
+    "generation",
+    "LastModified",
+    "mtime",
+    "created",
+)
+
+
+def _file_version(info: dict) -> str | None:
+    """Get the version of a remote file, for example its ETag.
+
+    Returns `None` if the file info has no field which changes with the file.
+    """
+    for key in _VERSION_KEYS:
+        if info.get(key) is not None:
+            return str(info[key])
+    return None
+
+
+def _consecutive_runs(idxs: list[int]) -> list[list[int]]:
+    runs: list[list[int]] = []
+    for idx in idxs:
+        if runs and runs[-1][-1] == idx - 1:
+            runs[-1].append(idx)
+        else:
+            runs.append([idx])
+    return runs
+
+
+def _evict_persisted(blocks_dir: Path, keep: Path):
+    """Delete the blocks of the least recently used files beyond `persist_max_size`.
+
+    The modification time of the folder of a file is its last use.
+    """
+    entries = []
+    for file_dir in blocks_dir.iterdir():
+        try:
+            size = sum(block.stat().st_size for block in file_dir.iterdir())
+            entries.append((file_dir.stat().st_mtime, size, file_dir))
+        except FileNotFoundError:
+            # deleted by another process
+            continue
+    total = sum(size for _, size, _ in entries)
+    for _, size, file_dir in sorted(entries):
+        if total <= block_cache_settings.persist_max_size:
+            break
+        if file_dir == keep:
+            continue
+        shutil.rmtree(file_dir, ignore_errors=True)
+        total -= size
+
+
+class BlockCache:
+    """LRU cache of file blocks keyed by `(url, version, offset)`.
+
+    The size of the cache is bounded by `block_cache_settings.max_size`.
+    """
+
+    def __init__(self):
+        self._blocks: OrderedDict[tuple[str, str, int], bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str, int]) -> bytes | None:
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is not None:
+                self._blocks.move_to_end(key)
+            return block
+
+    def put(self, key: tuple[str, str, int], block: bytes):
+        with self._lock:
+            if key in self._blocks:
+                self._size -= len(self._blocks.pop(key))
+            self._blocks[key] = block
+            self._size += len(block)
+            while self._size > block_cache_settings.max_size and self._blocks:
+                _, dropped = self._blocks.popitem(last=False)
+                self._size -= len(dropped)
+
+    def clear(self):
+        with self._lock:
+            self._blocks.clear()
+            self._size = 0
+
+
+# shared by all files opened in this process
+block_cache = BlockCache()
+
+
+class BlockCachedFile(io.RawIOBase):
+    """Read-only file object reading a remote file in cached blocks.
+
+    Blocks of ``block_cache_settings.block_size`` bytes are read with one request
+    for each run of consecutive missing blocks and then kept in :data:`block_cache`.
+    If ``block_cache_settings.persist`` is `True`, the blocks are also written
+    to and read from `settings.cache_dir`, up to ``block_cache_settings.persist_max_size``.
+
+    Blocks are only shared with other opens of a file which has a version,
+    like an ETag or a modification time. Otherwise a rewrite of the same size
+    can't be detected and the blocks are only reused by this file object.
+
+    Args:
+        fs: The filesystem of the file.
+        path: The path of the file in `fs`.
+    """
+
+    def __init__(self, fs: AbstractFileSystem, path: str):
+        super().__init__()
+        self.fs = fs
+        self.path = path
+        info = fs.info(path)
+        self.size: int = info["size"]
+        self.url = fs.unstrip_protocol(path)
+        version = _file_version(info)
+        # unversioned files get a version of their own, they are never persisted
+        self.version = uuid4().hex if version is None else version
+        self.block_size = block_cache_settings.block_size
+        self._pos = 0
+        self._persist_dir: Path | None = None
+        if block_cache_settings.persist and version is not None:
+            file_key = hash_and_encode_as_b62(
+                f"{self.url}:{self.version}:{self.block_size}"
+            )
+            self._persist_dir = setup_settings.cache_dir / "_blocks" / file_key
+            self._persist_dir.mkdir(parents=True, exist_ok=True)
+            os.utime(self._persist_dir)
+            _evict_persisted(self._persist_dir.parent, keep=self._persist_dir)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}.")
+        if pos < 0:
+            raise ValueError("Negative seek position.")
+        self._pos = pos
+        return pos
+
+    def read(self, size: int | None = -1) -> bytes:
+        if size is None or size < 0:
+            end = self.size
+        else:
+            end = min(self._pos + size, self.size)
+        data = self._read(self._pos, end)
+        self._pos += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        data = self.read(len(view))
+        view[: len(data)] = data
+        return len(data)
+
+    def _read(self, start: int, end: int) -> bytes:
+        if start >= end:
+            return b""
+        if end - start > block_cache_settings.max_size // 2:
+            # large reads would only push everything else out of the cache
+            return self.fs.cat_file(self.path, start=start, end=end)
+        first, last = start // self.block_size, (end - 1) // self.block_size
+        data = b"".join(self._get_blocks(first, last))
+        offset = start - first * self.block_size
+        return data[offset : offset + end - start]
+
+    def _get_blocks(self, first: int, last: int) -> list[bytes]:
+        blocks: dict[int, bytes] = {}
+        missing = []
+        for idx in range(first, last + 1):
+            block = self._get_block(idx)
+            if block is None:
+                missing.append(idx)
+            else:
+                blocks[idx] = block
+        for run in _consecutive_runs(missing):
+            start = run[0] * self.block_size
+            end = min((run[-1] + 1) * self.block_size, self.size)
+            data = self.fs.cat_file(self.path, start=start, end=end)
+            for i, idx in enumerate(run):
+                block = data[i * self.block_size : (i + 1) * self.block_size]
+                blocks[idx] = block
+                self._put_block(idx, block)
+        return [blocks[idx] for idx in range(first, last + 1)]
+
+    def _get_block(self, idx: int) -> bytes | None:
+        key = (self.url, self.version, idx * self.block_size)
+        block = block_cache.get(key)
+        if block is None and self._persist_dir is not None:
+            block_path = self._persist_dir / str(idx)
+            if block_path.exists():
+                block = block_path.read_bytes()
+                block_cache.put(key, block)
+        # blocks cached with another block size don't match
+        expected_size = min(self.block_size, self.size - idx * self.block_size)
+        if block is not None and len(block) != expected_size:
+            return None
+        return block
+
+    def _put_block(self, idx: int, block: bytes):
+        block_cache.put((self.url, self.version, idx * self.block_size), block)
+        if self._persist_dir is not None:
+            block_path = self._persist_dir / str(idx)
+            # write to a temporary file first, concurrent readers never see partial blocks
+            tmp_path = block_path.with_name(
+                f"{idx}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            tmp_path.write_bytes(block)
+            tmp_path.replace(block_path)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from lamindb_setup import settings as setup_settings
+from lamindb_setup.core.hashing import hash_file, hash_from_hashes_list
+
+from lamindb.core.subsettings._creation_settings import creation_settings
+
+# files modified this recently might still change within the mtime resolution
+# of the filesystem without changing their mtime, their hashes are not stored
+_RACY_NS = 2 * 10**9
+# the least recently stored entries are dropped beyond this number
+_MAX_ENTRIES = 1_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    hash_type TEXT NOT NULL,
+    stored_at INTEGER NOT NULL
+)
+"""
+
+
+class HashCache:
+    """Hashes of local files in SQLite, keyed by `(path, inode, size, mtime_ns)`.
+
+    An entry is only returned while the inode, size and modification time of
+    the file are unchanged. The database is `_hash_cache.sqlite` in
+    `settings.cache_dir`, shared by all processes of the same user.
+    """
+
+    def __init__(self):
+        # sqlite connections can't be shared across threads and forked processes
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection | None:
+        db_path = setup_settings.cache_dir / "_hash_cache.sqlite"
+        key = (os.getpid(), db_path)
+        if getattr(self._local, "key", None) != key:
+            try:
+                conn = sqlite3.connect(db_path, timeout=10, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(_SCHEMA)
+                self._prune(conn)
+            except sqlite3.Error:
+                conn = None
+            self._local.key, self._local.conn = key, conn
+        return self._local.conn
+
+    @staticmethod
+    def _prune(conn: sqlite3.Connection):
+        (n_entries,) = conn.execute("SELECT COUNT(*) FROM hashes").fetchone()
+        if n_entries > _MAX_ENTRIES:
+            conn.execute(
+                "DELETE FROM hashes WHERE path IN"
+                " (SELECT path FROM hashes ORDER BY stored_at LIMIT ?)",
+                (n_entries - _MAX_ENTRIES,),
+            )
+
+    def get(self, path: str, stat: os.stat_result) -> tuple[str, str] | None:
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT hash, hash_type FROM hashes WHERE path = ? AND inode = ?"
+                " AND size = ? AND mtime_ns = ?",
+                (path, stat.st_ino, stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return None if row is None else (row[0], row[1])
+
+    def put(self, path: str, stat: os.stat_result, hash: str, hash_type: str):
+        now = time.time_ns()
+        if now - stat.st_mtime_ns < _RACY_NS:
+            return None
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    stat.st_ino,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    hash,
+                    hash_type,
+                    now // 10**9,
+                ),
+            )
+        except sqlite3.Error:
+            # a locked or read-only cache only costs the rehashing
+            pass
+
+    def clear(self):
+        conn = self._connection()
+        if conn is not None:
+            conn.execute("DELETE FROM hashes")
+
+
+# shared by all hashing in this process
+hash_cache = HashCache()
+
+
+def cached_hash_file(path: Path, stat: os.stat_result | None = None) -> tuple[str, str]:
+    """Like `hash_file`, but reuses the hash of an unchanged file."""
+    if not creation_settings.artifact_use_hash_cache:
+        return hash_file(path)
+    resolved = Path(path).resolve()
+    if stat is None:
+        stat = resolved.stat()
+    abs_path = resolved.as_posix()
+    cached = hash_cache.get(abs_path, stat)
+    if cached is not None:
+        return cached
+    hash, hash_type = hash_file(path, stat.st_size)
+    hash_cache.put(abs_path, stat, hash, hash_type)
+    return hash, hash_type
+
+
+def cached_hash_dir(path: Path) -> tuple[int, str, str, int]:
+    """Like `hash_dir`, but reuses the hashes of unchanged files in the directory.
+
+    Only the files are stat-ed, a directory with unchanged files isn't read.
+    """
+    files = [subpath for subpath in path.rglob("*") if subpath.is_file()]
+
+    def hash_size(file):
+        stat = file.stat()
+        return cached_hash_file(file, stat)[0], stat.st_size
+
+    with ThreadPoolExecutor(creation_settings.artifact_max_workers) as pool:
+        hashes_sizes = list(pool.map(hash_size, files))
+    hashes = [hash for hash, _ in hashes_sizes]
+    size = sum(size for _, size in hashes_sizes)
+    return size, hash_from_hashes_list(hashes), "md5-d", len(hashes)
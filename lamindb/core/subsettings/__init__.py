@@ -5,8 +5,10 @@
 
    TransformSettings
    CreationSettings
+   BlockCacheSettings
 
 """
 
+from ._block_cache_settings import BlockCacheSettings
 from ._creation_settings import CreationSettings
 from ._transform_settings import TransformSettings
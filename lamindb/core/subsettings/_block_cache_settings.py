@@ -0,0 +1,29 @@
+class BlockCacheSettings:
+    enabled: bool = True
+    """Read remote `.h5ad` and `.h5` files through the block cache (default `True`).
+
+    h5py issues many small, repeated reads for metadata and chunk headers,
+    with the block cache every block of a file is requested only once.
+    """
+    block_size: int = 2 * 1024**2
+    """The size of the blocks in bytes (default 2 MiB)."""
+    max_size: int = 256 * 1024**2
+    """The maximum size of the blocks kept in memory in bytes (default 256 MiB).
+
+    The least recently used blocks are dropped first.
+    """
+    persist: bool = False
+    """Also write the blocks to :attr:`~lamindb.core.Settings.cache_dir` (default `False`).
+
+    Persisted blocks are reused by later sessions as long as the file doesn't change.
+    They are kept in the `_blocks` folder of the cache directory, delete it to clear them.
+    """
+    persist_max_size: int = 4 * 1024**3
+    """The maximum size of the persisted blocks in bytes (default 4 GiB).
+
+    When a file is opened, the blocks of the least recently used other files
+    are deleted beyond this size.
+    """
+
+
+block_cache_settings = BlockCacheSettings()
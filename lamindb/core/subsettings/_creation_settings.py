@@ -18,6 +18,24 @@ class CreationSettings:
 
     It speeds up file creation by about a factor 100.
     """
+    artifact_max_workers: int | None = None
+    """The number of workers hashing files in :meth:`~lamindb.Artifact.from_dir` and in folders (default `None`).
+
+    `None` uses the default of `concurrent.futures`, `1` hashes the files one after another.
+    """
+    artifact_use_processes: bool = False
+    """Hash files in :meth:`~lamindb.Artifact.from_dir` in processes instead of threads (default `False`).
+
+    Threads suffice for large files because hashing releases the GIL,
+    processes can be faster for very many small files.
+    """
+    artifact_use_hash_cache: bool = True
+    """Reuse the hashes of unchanged local files (default `True`).
+
+    Hashes are kept in :attr:`~lamindb.core.Settings.cache_dir` together with
+    the inode, size and modification time of the file. As long as these don't
+    change, hashing a file costs a single `stat`.
+    """
     search_names: bool = True
     """To speed up creating records (default `True`).
 
@@ -89,7 +89,7 @@ def install_ci(session, group):
         extras += "bionty,aws,gcp,zarr,fcs,jupyter"
         run(session, "uv pip install --system huggingface_hub")
     elif group == "unit-storage":
-        extras += "aws,zarr,bionty"
+        extras += "aws,zarr,bionty,dask"
         run(session, "uv pip install --system tiledbsoma>=1.15.0rc3")
     elif group == "tutorial":
         extras += "aws,jupyter,bionty"
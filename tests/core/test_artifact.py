@@ -492,6 +492,54 @@ def test_from_dir_many_artifacts(get_test_filepaths, key):
         artifact.delete(permanent=True, storage=False)
 
 
+@pytest.mark.parametrize("max_workers,use_processes", [(2, False), (2, True)])
+def test_from_dir_hash_in_pool(max_workers, use_processes):
+    test_dirpath = Path("./hash_pool_dir")
+    (test_dirpath / "subdir").mkdir(parents=True)
+    for i in range(10):
+        subdir = "subdir" if i % 2 else ""
+        (test_dirpath / subdir / f"file_{i}.txt").write_text(str(i % 8))
+    serial = ln.Artifact.from_dir(test_dirpath)
+    settings.creation.artifact_max_workers = max_workers
+    settings.creation.artifact_use_processes = use_processes
+    try:
+        pooled = ln.Artifact.from_dir(test_dirpath)
+    finally:
+        settings.creation.artifact_max_workers = None
+        settings.creation.artifact_use_processes = False
+        shutil.rmtree(test_dirpath)
+    # same order and the same duplicates are dropped
+    assert len(pooled) == 8
+    assert [(a.key, a.hash, a.size) for a in pooled] == [
+        (a.key, a.hash, a.size) for a in serial
+    ]
+
+
+def test_from_paths():
+    test_dirpath = Path("./from_paths_dir")
+    test_dirpath.mkdir()
+    filepaths = [test_dirpath / f"file_{i}.txt" for i in range(3)]
+    for i, filepath in enumerate(filepaths):
+        filepath.write_text(f"content {i}")
+    keys = [f"from_paths/file_{i}.txt" for i in range(3)]
+    with pytest.raises(ValueError):
+        _artifact._from_paths(filepaths, keys[:2])
+    artifacts = _artifact._from_paths(filepaths, keys)
+    assert [artifact.key for artifact in artifacts] == keys
+    ln.save(artifacts[:2])
+    # existing artifacts are returned and a changed file gets a new version
+    filepaths[1].write_text("changed")
+    existing, new_version, new = _artifact._from_paths(filepaths, keys)
+    assert existing == artifacts[0]
+    assert new_version.stem_uid == artifacts[1].stem_uid
+    assert new_version.uid != artifacts[1].uid
+    assert new_version._state.adding
+    assert new._state.adding
+    for artifact in artifacts[:2]:
+        artifact.delete(permanent=True, storage=False)
+    shutil.rmtree(test_dirpath)
+
+
 def test_delete_artifact(df):
     artifact = ln.Artifact.from_df(df, description="My test file to delete")
     artifact.save()
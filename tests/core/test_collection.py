@@ -1,3 +1,4 @@
+import pickle
 from inspect import signature
 
 import anndata as ad
@@ -8,6 +9,7 @@ import pandas as pd
 import pytest
 from django.db.models.deletion import ProtectedError
 from lamindb import _collection
+from lamindb.core import MappedCollection
 from scipy.sparse import csc_matrix, csr_matrix
 
 
@@ -261,6 +263,8 @@ def test_collection_mapped(adata, adata2):
     assert len(ls_ds[0]) == 3 and len(ls_ds[2]) == 3
     assert len(ls_ds[0]["X"]) == 3
     assert np.array_equal(ls_ds[2]["X"], np.array([1, 2, 5]))
+    assert ls_ds.get_merged_labels("feat1").tolist() == ["A", "B", "A", "B"]
+    assert ls_ds.get_merged_categories("feat1") == ["A", "B"]
     weights = ls_ds.get_label_weights("feat1")
     assert len(weights) == 4
     assert all(weights == 0.5)
@@ -283,6 +287,42 @@ def test_collection_mapped(adata, adata2):
     ls_ds.var_list = None
     assert ls_ds.check_vars_non_aligned(["MYC", "TCF7", "GATA1"]) == []
 
+    sampler = ln.core.BlockShuffleSampler(ls_ds, block_size=1, buffer_size=2)
+    assert len(sampler) == 4
+    assert sorted(sampler) == [0, 1, 2, 3]
+    sampler = ln.core.BlockShuffleSampler(
+        ls_ds, weights=ls_ds.get_label_weights("feat1"), num_samples=6
+    )
+    indices = list(sampler)
+    assert len(indices) == 6
+    assert all(0 <= idx < 4 for idx in indices)
+    # blocks with zero weights get no draws
+    for seed in range(10):
+        sampler = ln.core.BlockShuffleSampler(
+            ls_ds, block_size=1, weights=[1, 0, 0, 1], num_samples=6, seed=seed
+        )
+        assert set(sampler) <= {0, 3}
+    # resume in the middle of an epoch
+    sampler = ln.core.BlockShuffleSampler(ls_ds, block_size=1, buffer_size=2)
+    order = list(sampler)
+    sampler.set_epoch(0)
+    iterator = iter(sampler)
+    first = [next(iterator), next(iterator)]
+    state = sampler.state_dict()
+    assert state == {"seed": 0, "epoch": 0, "position": 2}
+    resumed = ln.core.BlockShuffleSampler(ls_ds, block_size=1, buffer_size=2)
+    resumed.load_state_dict(state)
+    assert first + list(resumed) == order
+    assert resumed.state_dict() == {"seed": 0, "epoch": 1, "position": 0}
+    # indices prefetched by a DataLoader are not consumed
+    next(iterator)
+    state = sampler.state_dict(num_consumed=2)
+    assert state == {"seed": 0, "epoch": 0, "position": 2}
+    resumed.load_state_dict(state)
+    assert first + list(resumed) == order
+    with pytest.raises(ValueError):
+        sampler.state_dict(num_consumed=4)
+
     ls_ds.close()
     assert ls_ds.closed
     del ls_ds
@@ -299,6 +339,15 @@ def test_collection_mapped(adata, adata2):
     assert len(ls_ds[0]) == 3 and len(ls_ds[2]) == 3
     assert ls_ds[0]["_store_idx"] == 0
     assert ls_ds[2]["_store_idx"] == 1
+    # worker processes attach to the shared indices
+    ls_ds_worker = pickle.loads(pickle.dumps(ls_ds))  # noqa: S301
+    assert ls_ds_worker._shms.keys() == ls_ds._shms.keys()
+    assert np.array_equal(ls_ds_worker.indices, ls_ds.indices)
+    assert not ls_ds_worker.indices.flags.writeable
+    assert ls_ds_worker[2]["feat1"] == ls_ds[2]["feat1"]
+    ls_ds.close()
+    assert ls_ds._shms == {}
+    assert np.array_equal(ls_ds.indices_list[1], np.array([0, 1]))
 
     ls_ds = collection.mapped(
         layers_keys=["layer1"], obsm_keys=["X_pca"], obs_keys="feat1"
@@ -309,10 +358,91 @@ def test_collection_mapped(adata, adata2):
     assert np.array_equal(ls_ds[3]["obsm_X_pca"], np.array([3, 4]))
     assert ls_ds.shape == (4, 3)
     assert ls_ds.original_shapes[0] == (2, 3) and ls_ds.original_shapes[1] == (2, 3)
+    # batched access gives the same observations as single access
+    batch = ls_ds.__getitems__([3, 0, 2, 0])
+    assert len(batch) == 4
+    for i, idx in enumerate([3, 0, 2, 0]):
+        item = ls_ds[idx]
+        assert batch[i].keys() == item.keys()
+        assert np.array_equal(batch[i]["layer1"], item["layer1"])
+        assert np.array_equal(batch[i]["obsm_X_pca"], item["obsm_X_pca"])
+        assert batch[i]["feat1"] == item["feat1"]
+        assert batch[i]["_store_idx"] == item["_store_idx"]
     ls_ds.close()
 
     with collection.mapped(obs_keys="feat1", stream=True) as ls_ds:
         assert len(ls_ds[0]) == 3 and len(ls_ds[2]) == 3
+        iterable = ln.core.IterableMappedCollection(ls_ds, chunk_size=1, shuffle=False)
+        items = list(iterable)
+        assert len(items) == len(iterable) == 4
+        for i, item in enumerate(items):
+            assert np.array_equal(item["X"], ls_ds[i]["X"])
+            assert item["feat1"] == ls_ds[i]["feat1"]
+            assert item["_store_idx"] == ls_ds[i]["_store_idx"]
+        iterable = ln.core.IterableMappedCollection(ls_ds, chunk_size=2, seed=1)
+        assert sorted(item["X"].sum() for item in iterable) == [6, 8, 15, 17]
+
+    # the codes of the labels are read on first use
+    with collection.mapped(obs_keys="feat1", encode_labels=False) as ls_ds:
+        assert ls_ds._label_codes == {}
+        assert ls_ds.get_merged_categories("feat1") == ["A", "B"]
+        assert ls_ds._label_codes == {}
+        assert ls_ds[2]["feat1"] == "A"
+        assert list(ls_ds._label_codes) == ["feat1"]
+
+    # metadata is cached locally without changing the collection
+    meta_path = ln.settings.cache_dir / f"{collection.uid}_mapped_meta.parquet"
+    meta_path.unlink(missing_ok=True)
+    with MappedCollection.from_collection(
+        collection, obs_keys="feat1", cache_meta=True
+    ) as ls_ds:
+        meta = ls_ds.get_meta()
+        assert meta["n_obs"].tolist() == [2, 2]
+        assert meta["var"][1] is None
+    assert meta_path.exists()
+    assert collection.meta_artifact is None
+
+    # the labels come from the metadata too
+    def fail(*args, **kwargs):
+        raise AssertionError("labels should not be read")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(MappedCollection, "_read_label_codes", fail)
+        with MappedCollection.from_collection(
+            collection, obs_keys="feat1", cache_meta=True
+        ) as ls_ds:
+            assert ls_ds.shape == (4, 3)
+            assert ls_ds[2]["feat1"] == 0
+            assert ls_ds.get_merged_categories("feat1") == ["A", "B"]
+            assert ls_ds.get_label_weights("feat1").tolist() == [0.5] * 4
+    # and is saved to meta_artifact only on request
+    with MappedCollection.from_collection(
+        collection, obs_keys="feat1", save_meta=True
+    ) as ls_ds:
+        assert ls_ds.shape == (4, 3)
+    meta_artifact = collection.meta_artifact
+    assert meta_artifact is not None
+    meta_path.unlink()
+    with MappedCollection.from_collection(
+        collection, obs_keys="feat1", save_meta=True
+    ) as ls_ds:
+        assert ls_ds[2]["feat1"] == 0
+    assert collection.meta_artifact == meta_artifact
+    assert not meta_path.exists()
+    with MappedCollection.from_collection(
+        collection, obs_filter=("feat1", "B"), save_meta=True
+    ) as ls_ds:
+        assert ls_ds.shape == (2, 3)
+        assert np.array_equal(ls_ds[1]["X"], np.array([4, 5, 8]))
+    assert collection.meta_artifact != meta_artifact
+    assert collection.meta_artifact.stem_uid == meta_artifact.stem_uid
+    # the same filter as a dictionary reuses the metadata
+    meta_artifact = collection.meta_artifact
+    with MappedCollection.from_collection(
+        collection, obs_filter={"feat1": ["B"]}, save_meta=True
+    ) as ls_ds:
+        assert ls_ds.shape == (2, 3)
+    assert collection.meta_artifact == meta_artifact
 
     with pytest.raises(ValueError):
         with collection_outer.mapped(obs_keys="feat1", join="inner"):
@@ -337,14 +467,101 @@ def test_collection_mapped(adata, adata2):
         assert np.array_equal(ls_ds[3]["obsm_X_pca"], np.array([3, 4]))
         assert ls_ds.check_vars_non_aligned(["MYC", "TCF7", "GATA1"]) == [2]
         assert not ls_ds.check_vars_sorted()
+        batch = ls_ds.__getitems__([5, 0, 3])
+        assert np.array_equal(batch[0]["X"], np.array([4, 5, 8, 0, 0, 0]))
+        assert np.array_equal(batch[1]["X"], np.array([0, 0, 0, 3, 1, 2]))
+        assert np.array_equal(batch[2]["X"], np.array([0, 0, 0, 8, 4, 5]))
+
+    # serial and concurrent reading of the metadata give the same result
+    with MappedCollection.from_collection(
+        collection_outer, obs_keys="feat1", join="outer", max_workers=1
+    ) as ls_ds_serial:
+        with MappedCollection.from_collection(
+            collection_outer, obs_keys="feat1", join="outer", max_workers=3
+        ) as ls_ds:
+            assert ls_ds.n_obs_list == ls_ds_serial.n_obs_list
+            assert ls_ds.var_joint.equals(ls_ds_serial.var_joint)
+            assert ls_ds.encoders == ls_ds_serial.encoders
+
+    # whole artifacts are assigned to each rank
+    n_obs = 0
+    for rank in range(2):
+        with MappedCollection.from_collection(
+            collection, obs_keys="feat1", shard=(rank, 2)
+        ) as ls_ds:
+            assert len(ls_ds.storages) == 1
+            assert ls_ds.shape == (2, 3)
+            n_obs += ls_ds.n_obs
+    assert n_obs == 4
+    with pytest.raises(ValueError):
+        MappedCollection.from_collection(collection, shard=(2, 2))
+    with pytest.raises(ValueError):
+        MappedCollection.from_collection(collection, shard=(0, 3))
+
+    # sparse output
+    with MappedCollection.from_collection(
+        collection_outer, layers_keys="X", obs_keys="feat1", join="outer", output="csr"
+    ) as ls_ds:
+        assert isinstance(ls_ds[0]["X"], csr_matrix)
+        assert ls_ds[0]["X"].shape == (1, 6)
+        assert np.array_equal(ls_ds[0]["X"].toarray()[0], np.array([0, 0, 0, 3, 1, 2]))
+        batch = ls_ds.collate_csr(ls_ds.__getitems__([4, 3, 0]))
+        assert isinstance(batch["X"], csr_matrix)
+        assert np.array_equal(
+            batch["X"].toarray(),
+            np.array([[1, 2, 5, 0, 0, 0], [0, 0, 0, 8, 4, 5], [0, 0, 0, 3, 1, 2]]),
+        )
+        assert batch["feat1"].tolist() == [0, 1, 0]
+    with pytest.raises(ValueError):
+        MappedCollection.from_collection(collection, output="coo")
 
     with collection_outer.mapped(layers_keys="layer1", join="outer") as ls_ds:
         assert np.array_equal(ls_ds[0]["layer1"], np.array([0, 0, 0, 3, 0, 2]))
         assert np.array_equal(ls_ds[4]["layer1"], np.array([1, 2, 5, 0, 0, 0]))
 
-    # csc matrix in layers
+    # only a subset of variables
+    with MappedCollection.from_collection(
+        collection_outer,
+        layers_keys=["X", "layer1"],
+        join="outer",
+        var_subset=["C", "MYC", "TCF7"],
+    ) as ls_ds:
+        assert ls_ds.shape == (6, 3)
+        assert ls_ds.var_joint.tolist() == ["C", "MYC", "TCF7"]
+        assert np.array_equal(ls_ds[0]["X"], np.array([0, 1, 2]))
+        assert np.array_equal(ls_ds[0]["layer1"], np.array([0, 0, 2]))
+        assert np.array_equal(ls_ds[4]["X"], np.array([5, 0, 0]))
+        batch = ls_ds.__getitems__([5, 2])
+        assert np.array_equal(batch[0]["X"], np.array([8, 0, 0]))
+        assert np.array_equal(batch[1]["X"], np.array([0, 1, 2]))
     with pytest.raises(ValueError):
-        collection_csc.mapped(layers_keys="layer1")
+        MappedCollection.from_collection(
+            collection_outer, join="inner", var_subset=["C", "MYC"]
+        )
+    # arrays loaded into memory
+    with MappedCollection.from_collection(
+        collection_outer,
+        layers_keys=["X", "layer1"],
+        obsm_keys="X_pca",
+        join="outer",
+        preload=True,
+    ) as ls_ds:
+        assert np.array_equal(ls_ds[0]["layer1"], np.array([0, 0, 0, 3, 0, 2]))
+        assert np.array_equal(ls_ds[4]["X"], np.array([1, 2, 5, 0, 0, 0]))
+        assert np.array_equal(ls_ds[3]["obsm_X_pca"], np.array([3, 4]))
+        batch = ls_ds.__getitems__([5, 0])
+        assert np.array_equal(batch[0]["X"], np.array([4, 5, 8, 0, 0, 0]))
+        assert np.array_equal(batch[1]["layer1"], np.array([0, 0, 0, 3, 0, 2]))
+
+    # csc matrix in layers
+    with collection_csc.mapped(layers_keys="layer1", obs_keys="feat1") as ls_ds:
+        assert np.array_equal(ls_ds[0]["layer1"], np.array([0, 2, 3]))
+        assert np.array_equal(ls_ds[1]["layer1"], np.array([4, 5, 6]))
+        assert np.array_equal(ls_ds[2]["layer1"], np.array([1, 2, 5]))
+        batch = ls_ds.__getitems__([1, 3, 0])
+        assert np.array_equal(batch[0]["layer1"], np.array([4, 5, 6]))
+        assert np.array_equal(batch[1]["layer1"], np.array([4, 5, 8]))
+        assert np.array_equal(batch[2]["layer1"], np.array([0, 2, 3]))
 
     # test with obs_filter
     # wrong obs_vilter value
@@ -359,6 +576,13 @@ def test_collection_mapped(adata, adata2):
         assert len(weights) == 4
         assert all(weights == 0.5)
 
+    with collection.mapped(obs_filter={"feat1": ("A", "B"), "~feat2": "A"}) as ls_ds:
+        assert ls_ds.shape == (2, 3)
+        assert np.array_equal(ls_ds[0]["X"], np.array([4, 5, 6]))
+        assert np.array_equal(ls_ds[1]["X"], np.array([4, 5, 8]))
+    with collection.mapped(obs_filter={"~feat1": ("A", "B")}) as ls_ds:
+        assert ls_ds.shape == (0, 3)
+
     with collection.mapped(obs_filter=("feat1", "B")) as ls_ds:
         assert ls_ds.shape == (2, 3)
         assert np.array_equal(ls_ds[0]["X"], np.array([4, 5, 6]))
@@ -370,6 +594,10 @@ def test_collection_mapped(adata, adata2):
     collection.delete(permanent=True)
     collection_outer.delete(permanent=True)
     collection_csc.delete(permanent=True)
+    for meta_artifact in ln.Artifact.filter(
+        description__startswith="Metadata of MappedCollection", visibility=0
+    ).all():
+        meta_artifact.delete(permanent=True)
     artifact1.delete(permanent=True)
     artifact2.delete(permanent=True)
     artifact3.delete(permanent=True)
@@ -67,6 +67,8 @@ def test_anndata_io():
 
 @pytest.mark.parametrize("adata_format", ["h5ad", "zarr"])
 def test_backed_access(adata_format):
+    import anndata as ad
+
     fp = ln.core.datasets.anndata_file_pbmc68k_test()
     if adata_format == "zarr":
         adata = load_h5ad(fp)
@@ -98,6 +100,29 @@ def test_backed_access(adata_format):
     assert isinstance(access.obs_names, pd.Index)
     assert isinstance(access.var_names, pd.Index)
     assert access.raw.shape == (30, 100)
+
+    # obs and var are dataframes
+    assert isinstance(access.obs, pd.DataFrame)
+    assert isinstance(access.var, pd.DataFrame)
+    assert pd.concat([access.obs, access[:5].obs]).shape[0] == 35
+    assert ad.AnnData(obs=access.obs, var=access.var).shape == (30, 200)
+
+    # lazy obs columns are read on access and give masks for subsetting
+    labels = access.obs_lazy["bulk_labels"]
+    assert list(access.obs_lazy._cache) == ["bulk_labels"]
+    assert labels.index.equals(access.obs_names)
+    assert labels.tolist() == access.obs["bulk_labels"].tolist()
+    mask = labels == labels.iloc[0]
+    assert access[mask].shape == (mask.sum(), 200)
+    obs_lazy = access.obs_lazy
+    assert access[obs_lazy.bulk_labels.isin([labels.iloc[0]])].shape[0] == mask.sum()
+    # the other attributes come from the whole dataframe
+    obs = obs_lazy.to_memory()
+    assert obs_lazy.head().equals(obs.head())
+    assert obs_lazy.shape == obs.shape
+    assert obs_lazy.iloc[1].equals(obs.iloc[1])
+    assert obs_lazy.loc[mask, "bulk_labels"].equals(obs.loc[mask, "bulk_labels"])
+    assert access.var_lazy.head(3).index.equals(access.var_names[:3])
     assert access.obsp["test"].to_memory().sum() == 30
     assert access.varp["test"].to_memory().sum() == 200
     assert access.layers["test"][0].sum() == 200
@@ -135,6 +160,10 @@ def test_backed_access(adata_format):
 
     assert access.to_memory().shape == (30, 200)
     assert sub.to_memory().shape == (30, 3)
+    # the elements of zarr stores are read concurrently
+    adata_sub = sub.to_memory(max_workers=2, max_inflight_bytes=1)
+    assert adata_sub.var_names.tolist() == var_sub
+    assert adata_sub.obsm["X_pca"].shape == (30, 50)
 
     access.close()
     assert access.closed
@@ -151,12 +180,166 @@ def test_backed_access(adata_format):
         idx = np.array([3, 1, 2])
         assert access[:, idx].to_memory().shape == (30, 3)
         assert access[idx].to_memory().shape == (3, 200)
+        # subsets are a part of the dask graph
+        x_dask = access[idx, 5:10].to_dask()
+        assert x_dask.shape == (3, 5)
+        assert np.array_equal(x_dask.compute(), access[idx, 5:10].X)
+        layer_dask = access[:10].to_dask("test")
+        assert layer_dask.compute().sum() == 200
 
     if adata_format == "zarr":
         assert fp.suffix == ".zarr"
         shutil.rmtree(fp)
 
 
+@pytest.mark.parametrize("adata_format", ["h5ad", "zarr"])
+def test_backed_access_fancy_indexing(adata_format):
+    from lamindb.core.storage._anndata_accessor import _coalesce_spans
+
+    starts = np.array([0, 3, 2000, 2002])
+    range_starts, range_ends, offsets = _coalesce_spans(starts, starts + 1, 1024)
+    assert range_starts.tolist() == [0, 2000]
+    assert range_ends.tolist() == [4, 2003]
+    assert offsets.tolist() == [0, 3, 4, 6]
+
+    fp = ln.core.datasets.anndata_file_pbmc68k_test()
+    adata = load_h5ad(fp)
+    if adata_format == "zarr":
+        fp = fp.with_suffix(".zarr")
+        write_adata_zarr(adata, fp, lambda *args, **kwargs: None)
+
+    def to_dense(x):
+        return x.toarray() if hasattr(x, "toarray") else x
+
+    # unsorted and repeated indices in both dimensions
+    oidx, vidx = np.array([20, 3, 3, 29, 0]), np.array([150, 2, 7, 2])
+    with backed_access(fp, using_key=None) as access:
+        sub = access[oidx, vidx].to_memory()
+    expected = adata[oidx, vidx]
+    assert np.array_equal(sub.X, expected.X)
+    assert np.array_equal(
+        to_dense(sub.layers["test"]), to_dense(expected.layers["test"])
+    )
+    assert np.array_equal(sub.obsm["X_pca"], expected.obsm["X_pca"])
+    assert sub.obs_names.tolist() == expected.obs_names.tolist()
+    assert sub.obs["bulk_labels"].tolist() == expected.obs["bulk_labels"].tolist()
+
+    if adata_format == "zarr":
+        shutil.rmtree(fp)
+
+
+def test_backed_access_csr_reads(monkeypatch):
+    from lamindb.core.storage import _anndata_accessor
+    from lamindb.core.storage._anndata_accessor import _max_gap, _read_spans
+
+    n_rows_read: dict[str, int] = {}
+
+    def counting_read_spans(elem, starts, ends, *args, **kwargs):
+        data, offsets = _read_spans(elem, starts, ends, *args, **kwargs)
+        name = elem.name.rsplit("/", 1)[-1]
+        n_rows_read[name] = n_rows_read.get(name, 0) + len(data)
+        return data, offsets
+
+    monkeypatch.setattr(_anndata_accessor, "_read_spans", counting_read_spans)
+    monkeypatch.setattr(_anndata_accessor, "_MAX_GAP_BYTES", 512)
+    filepath = ln.core.datasets.anndata_file_synthetic(
+        n_obs=20000, n_vars=10, filepath="csr_reads.h5ad"
+    )
+    with h5py.File(filepath, mode="a") as f:
+        # contiguous, gaps within chunks would be read anyway
+        indptr = f["X/indptr"][:]
+        del f["X/indptr"]
+        f.create_dataset("X/indptr", data=indptr)
+        max_gap = _max_gap(f["X/indptr"])
+    idxs = np.sort(np.random.default_rng(0).choice(20000, 32, replace=False))
+    with backed_access(filepath, using_key=None) as access:
+        X = access[idxs].X
+    assert np.array_equal(X.toarray(), load_h5ad(filepath)[idxs].X.toarray())
+    # only the indptr pairs of the rows and bounded gaps are read
+    assert 0 < n_rows_read["indptr"] <= len(idxs) * (2 + max_gap)
+    assert n_rows_read["indptr"] < 20000 // 4
+    filepath.unlink()
+
+
+def test_mapped_getitems_reads(monkeypatch):
+    from lamindb.core import _mapped_collection
+    from lamindb.core.storage import _anndata_accessor
+    from lamindb.core.storage._anndata_accessor import _max_gap, _read_spans
+
+    class CountingArray:
+        def __init__(self, elem):
+            self.elem = elem
+            self.dtype, self.shape = elem.dtype, elem.shape
+            self.chunks = getattr(elem, "chunks", None)
+
+        def __getitem__(self, key):
+            data = self.elem[key]
+            names_read.append(getattr(self.elem, "name", ""))
+            n_rows_read.append(len(data))
+            return data
+
+    def counting_read_spans(elem, *args, **kwargs):
+        return _read_spans(CountingArray(elem), *args, **kwargs)
+
+    names_read: list[str] = []
+    n_rows_read: list[int] = []
+    monkeypatch.setattr(_mapped_collection, "_read_spans", counting_read_spans)
+    filepath = ln.core.datasets.anndata_file_synthetic(
+        n_obs=4000, n_vars=1000, sparse=False, filepath="getitems_reads.h5ad"
+    )
+    with h5py.File(filepath, mode="r") as f:
+        max_gap = _max_gap(f["X"])
+    idxs = np.random.default_rng(0).choice(4000, 32, replace=False)
+    with ln.core.MappedCollection([filepath]) as mapped:
+        batch = mapped.__getitems__(idxs.tolist())
+        assert np.array_equal(batch[5]["X"], mapped[int(idxs[5])]["X"])
+    # each row adds at most a bounded gap, not whole ranges of rows
+    assert sum(n_rows_read) <= len(idxs) * (1 + max_gap)
+    assert sum(n_rows_read) < 4000 // 4
+    filepath.unlink()
+
+    # the indptr of csr rows is read in coalesced pairs too
+    monkeypatch.setattr(_anndata_accessor, "_MAX_GAP_BYTES", 512)
+    filepath = ln.core.datasets.anndata_file_synthetic(
+        n_obs=20000, n_vars=10, filepath="getitems_reads_csr.h5ad"
+    )
+    with h5py.File(filepath, mode="a") as f:
+        # contiguous, gaps within chunks would be read anyway
+        indptr = f["X/indptr"][:]
+        del f["X/indptr"]
+        f.create_dataset("X/indptr", data=indptr)
+        max_gap = _max_gap(f["X/indptr"])
+    idxs = np.random.default_rng(0).choice(20000, 32, replace=False)
+
+    class CountingGroup:
+        def __init__(self, group):
+            self.group, self.attrs = group, group.attrs
+
+        def __getitem__(self, key):
+            return CountingArray(self.group[key])
+
+    get_lazy_data = ln.core.MappedCollection._get_lazy_data
+
+    def counting_get_lazy_data(self, *args, **kwargs):
+        return CountingGroup(get_lazy_data(self, *args, **kwargs))
+
+    monkeypatch.setattr(_mapped_collection, "_read_spans", _read_spans)
+    monkeypatch.setattr(
+        ln.core.MappedCollection, "_get_lazy_data", counting_get_lazy_data
+    )
+    with ln.core.MappedCollection([filepath]) as mapped:
+        names_read.clear()
+        n_rows_read.clear()
+        batch = mapped.__getitems__(idxs.tolist())
+        n_indptr_read = sum(
+            n for name, n in zip(names_read, n_rows_read) if name.endswith("indptr")
+        )
+        assert np.array_equal(batch[5]["X"], mapped[int(idxs[5])]["X"])
+    assert n_indptr_read <= len(idxs) * (2 + max_gap)
+    assert n_indptr_read < 20000 // 4
+    filepath.unlink()
+
+
 def test_infer_suffix():
     import anndata as ad
 
@@ -185,6 +368,8 @@ def test_backed_bad_format(bad_adata_path):
 
     assert isinstance(sub.obs, pd.DataFrame)
     assert isinstance(sub.var, pd.DataFrame)
+    assert access.obs_lazy.shape[0] == 30
+    assert access.obs_lazy.to_memory().shape == access.obs_lazy.shape
     assert isinstance(sub.obs_names, pd.Index)
     assert isinstance(sub.var_names, pd.Index)
 
@@ -221,6 +406,101 @@ def test_anndata_open_mode():
     artifact.delete(permanent=True, storage=True)
 
 
+def test_artifact_open_handle_pool(monkeypatch):
+    from lamindb.core.storage import _anndata_accessor
+    from lamindb.core.storage._backed_access import handle_pool
+
+    fp = ln.core.datasets.anndata_file_pbmc68k_test()
+    artifact = ln.Artifact(fp, key="test_handle_pool.h5ad").save()
+
+    # not pooled by default
+    with artifact.open() as access, artifact.open() as access_other:
+        assert access_other is not access
+    assert access.closed
+
+    monkeypatch.setattr(ln.settings, "pool_handles", True)
+    access = artifact.open()
+    with artifact.open() as access_shared:
+        assert access_shared._access is access._access
+    assert access_shared.closed
+    with pytest.raises(ValueError):
+        access_shared[:5]
+    # still used by the first call
+    assert not access.closed
+    shared = access._access
+    access.close()
+    assert access.closed
+    # unused handles stay open
+    assert not shared.closed
+    access = artifact.open()
+    assert access._access is shared
+    access.close()
+
+    # closed on eviction, opened again without reading the metadata
+    monkeypatch.setattr(handle_pool, "max_idle", 0)
+    handle_pool.release((artifact.uid, artifact.hash, "r"))
+    assert shared.closed
+
+    def fail(*args, **kwargs):
+        raise AssertionError("metadata should not be read")
+
+    monkeypatch.setattr(_anndata_accessor, "_safer_read_index", fail)
+    access = artifact.open()
+    assert access.shape == (30, 200)
+    monkeypatch.undo()
+    monkeypatch.setattr(ln.settings, "pool_handles", True)
+
+    # opening another version closes the handle once it is released
+    artifact.hash = "changed"
+    access_changed = artifact.open()
+    assert access_changed._access is not access._access
+    assert not access.closed
+    access.close()
+    assert access._access.closed
+    access_changed.close()
+
+    handle_pool.clear()
+    assert access_changed._access.closed
+    artifact.delete(permanent=True, storage=True)
+
+
+def test_handle_pool_concurrent_open():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from lamindb.core.storage._backed_access import HandlePool
+
+    fp = ln.core.datasets.anndata_file_pbmc68k_test()
+    pool = HandlePool()
+    opening, release_open = threading.Event(), threading.Event()
+
+    def slow_open(metadata):
+        opening.set()
+        release_open.wait(timeout=10)
+        return backed_access(fp, using_key=None, _metadata=metadata)
+
+    def fast_open(metadata):
+        return backed_access(fp, using_key=None, _metadata=metadata)
+
+    with ThreadPoolExecutor(2) as executor:
+        slow = executor.submit(pool.open, ("uid", "slow", "r"), slow_open)
+        opening.wait(timeout=10)
+        # a slow open doesn't block other keys
+        fast = executor.submit(pool.open, ("other_uid", "fast", "r"), fast_open)
+        access_fast = fast.result(timeout=10)
+        assert not slow.done()
+        # the same key opened meanwhile is shared, the duplicate is closed
+        access_first = pool.open(("uid", "slow", "r"), fast_open)
+        release_open.set()
+        access_slow = slow.result(timeout=10)
+    assert access_slow._access is access_first._access
+    assert pool._entries[("uid", "slow", "r")].refs == 2
+    for access in (access_fast, access_first, access_slow):
+        access.close()
+    pool.clear()
+    assert access_first._access.closed
+
+
 @pytest.mark.parametrize("storage", [None, "s3://lamindb-test/storage"])
 def test_write_read_tiledbsoma(storage):
     if storage is not None:
@@ -272,6 +552,19 @@ def test_write_read_tiledbsoma(storage):
         run_id = obs.read(column_names=["lamin_run_uid"]).concat().to_pandas()
         assert all(run_id == run.uid)
 
+    with ln.core.SOMAMappedCollection(
+        [artifact_soma.path], obs_keys="bulk_labels", encode_labels=False
+    ) as mapped:
+        assert len(mapped) == adata.n_obs
+        assert list(mapped.var_joint) == adata.var_names.tolist()
+        assert np.allclose(mapped[1]["data"], adata.X[1])
+        assert mapped[1]["bulk_labels"] == adata.obs["bulk_labels"].iloc[1]
+        batch = mapped.__getitems__([4, 0, 2])
+        assert np.allclose(batch[0]["data"], adata.X[4])
+        assert batch[2]["bulk_labels"] == adata.obs["bulk_labels"].iloc[2]
+        with pytest.raises(TypeError):
+            mapped.get_meta()
+
     cache_path = artifact_soma.cache()
     hash_before_changes = artifact_soma.hash
     with artifact_soma.open(mode="w") as store:
@@ -384,3 +677,126 @@ def test_backed_wrong_suffix():
         artifact.open()
 
     fp.unlink()
+
+
+def test_hash_cache(monkeypatch):
+    import os
+    import time
+
+    from lamindb.core.storage import _hash_cache
+    from lamindb_setup.core.hashing import hash_dir, hash_file
+
+    test_dirpath = Path("./hash_cache_dir")
+    (test_dirpath / "subdir").mkdir(parents=True)
+    for i in range(4):
+        filepath = test_dirpath / ("subdir" if i % 2 else "") / f"file_{i}.txt"
+        filepath.write_text(f"content {i}")
+        # hashes of very recently modified files aren't stored
+        mtime_ns = time.time_ns() - 10**10
+        os.utime(filepath, ns=(mtime_ns, mtime_ns))
+    filepath = test_dirpath / "file_0.txt"
+    _hash_cache.hash_cache.clear()
+
+    assert _hash_cache.cached_hash_file(filepath) == hash_file(filepath)
+    assert _hash_cache.cached_hash_dir(test_dirpath) == hash_dir(test_dirpath)
+
+    def fail_hash_file(*args, **kwargs):
+        raise AssertionError("unchanged files should not be hashed")
+
+    # unchanged files are looked up
+    monkeypatch.setattr(_hash_cache, "hash_file", fail_hash_file)
+    assert _hash_cache.cached_hash_file(filepath) == hash_file(filepath)
+    assert _hash_cache.cached_hash_dir(test_dirpath) == hash_dir(test_dirpath)
+    monkeypatch.undo()
+
+    # a changed file is hashed again
+    mtime_ns = filepath.stat().st_mtime_ns
+    filepath.write_text("changed")
+    os.utime(filepath, ns=(mtime_ns + 1, mtime_ns + 1))
+    assert _hash_cache.cached_hash_file(filepath) == hash_file(filepath)
+    assert _hash_cache.cached_hash_dir(test_dirpath) == hash_dir(test_dirpath)
+
+    # hashed one after another with a single worker
+    monkeypatch.setattr(ln.settings.creation, "artifact_max_workers", 1)
+    assert _hash_cache.cached_hash_dir(test_dirpath) == hash_dir(test_dirpath)
+    # a folder without files
+    empty_dirpath = test_dirpath / "empty"
+    empty_dirpath.mkdir()
+    size, _, hash_type, n_objects = _hash_cache.cached_hash_dir(empty_dirpath)
+    assert (size, hash_type, n_objects) == (0, "md5-d", 0)
+
+    _hash_cache.hash_cache.clear()
+    shutil.rmtree(test_dirpath)
+
+
+def test_block_cache(monkeypatch):
+    from fsspec.implementations.memory import MemoryFileSystem
+    from lamindb.core.storage._block_cache import block_cache
+
+    fp = ln.core.datasets.anndata_file_pbmc68k_test()
+    adata = load_h5ad(fp)
+    path = ln.UPath("memory://block-cache/pbmc68k_test.h5ad")
+    path.fs.put_file(fp.as_posix(), "block-cache/pbmc68k_test.h5ad")
+
+    requests = []
+    cat_file = MemoryFileSystem.cat_file
+
+    def counting_cat_file(self, path, start=None, end=None, **kwargs):
+        requests.append((start, end))
+        return cat_file(self, path, start=start, end=end, **kwargs)
+
+    monkeypatch.setattr(MemoryFileSystem, "cat_file", counting_cat_file)
+    monkeypatch.setattr(ln.settings.block_cache, "block_size", 16 * 1024)
+    block_cache.clear()
+
+    with backed_access(path) as access:
+        assert np.array_equal(access[5:15].X, adata.X[5:15])
+    assert len(requests) > 0
+    # repeated slicing is served from the cache
+    requests.clear()
+    with backed_access(path) as access:
+        assert np.array_equal(access[5:15].X, adata.X[5:15])
+    assert len(requests) == 0
+
+    # persisted blocks survive clearing the in-memory cache
+    shutil.rmtree(ln.settings.cache_dir / "_blocks", ignore_errors=True)
+    monkeypatch.setattr(ln.settings.block_cache, "persist", True)
+    block_cache.clear()
+    with backed_access(path) as access:
+        access[20:25].to_memory()
+    block_cache.clear()
+    requests.clear()
+    with backed_access(path) as access:
+        assert np.array_equal(access[20:25].X, adata.X[20:25])
+    assert len(requests) == 0
+
+    # the blocks of other files are deleted beyond the size limit
+    blocks_dir = ln.settings.cache_dir / "_blocks"
+    (persisted,) = blocks_dir.iterdir()
+    path.fs.put_file(fp.as_posix(), "block-cache/pbmc68k_test_other.h5ad")
+    monkeypatch.setattr(ln.settings.block_cache, "persist_max_size", 0)
+    with backed_access(path.with_name("pbmc68k_test_other.h5ad")) as access:
+        assert access.shape == adata.shape
+    assert not persisted.exists()
+    assert len(list(blocks_dir.iterdir())) == 1
+
+    # blocks of files without a version are neither shared nor persisted
+    info = MemoryFileSystem.info
+
+    def info_without_version(self, path, **kwargs):
+        file_info = info(self, path, **kwargs)
+        file_info.pop("created", None)
+        return file_info
+
+    monkeypatch.setattr(MemoryFileSystem, "info", info_without_version)
+    shutil.rmtree(blocks_dir)
+    for _ in range(2):
+        requests.clear()
+        with backed_access(path) as access:
+            assert np.array_equal(access[5:15].X, adata.X[5:15])
+        assert len(requests) > 0
+    assert not blocks_dir.exists() or not any(blocks_dir.iterdir())
+
+    block_cache.clear()
+    shutil.rmtree(blocks_dir, ignore_errors=True)
+    path.fs.rm("block-cache", recursive=True)